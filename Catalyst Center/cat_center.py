@@ -1,5 +1,13 @@
+import csv
+import gzip
+import hashlib
 import json
+import sqlite3
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
 
 from dotenv import load_dotenv
 from requests import RequestException
@@ -20,16 +28,487 @@ CAT_CENTER_HOST = os.getenv("CAT_CENTER_HOST")
 CAT_CENTER_USER = os.getenv("CAT_CENTER_USER")
 CAT_CENTER_PASSWORD = os.getenv("CAT_CENTER_PASSWORD")
 
+# InfluxDB (TIG-MDT stack) for the health collector
+INFLUXDB_URL = os.getenv("INFLUXDB_URL")
+INFLUXDB_TOKEN = os.getenv("INFLUXDB_TOKEN")
+INFLUXDB_ORG = os.getenv("INFLUXDB_ORG")
+INFLUXDB_BUCKET = os.getenv("INFLUXDB_BUCKET")
+
 # Disable warnings for insecure HTTPS requests
 requests.packages.urllib3.disable_warnings()
 
+# Client-side rate limits per endpoint family (first path segment of the endpoint): (requests per minute, burst)
+# A "METHOD family" key limits only that method (e.g., submitting flow analyses, not fetching their results)
+# Catalyst Center enforces per-minute limits on many Intent APIs, adjust these to match your controller
+RATE_LIMITS = {
+    "default": (100, 10),
+    "network-device": (60, 5),
+    "network-device-poller": (5, 1),
+    "POST flow-analysis": (5, 2),
+    "flow-analysis": (60, 5),
+    "site-health": (5, 1),
+    "topology": (10, 2),
+    "task": (300, 20),
+    "file": (60, 5),
+}
+
+# Snapshot of the physical topology graph (reloaded instead of re-fetching topology/physical-topology)
+script_dir = os.path.dirname(os.path.realpath(__file__))
+TOPOLOGY_SNAPSHOT = os.path.join(script_dir, "topology_snapshot.json")
+TOPOLOGY_MAX_AGE = 60 * 60  # Seconds before the snapshot is considered stale and re-fetched
+
+# Bulk path trace: results cache (keyed by source, destination and topology version) and concurrency cap
+PATH_TRACE_CACHE = os.path.join(script_dir, "path_trace_cache.json")
+BULK_TRACE_WORKERS = 5
+
+# Delta device inventory sync: local SQLite snapshot and change set log (JSON Lines)
+INVENTORY_DB = os.path.join(script_dir, "device_inventory.db")
+INVENTORY_CHANGES = os.path.join(script_dir, "inventory_changes.jsonl")
+PAGE_LIMIT = 500  # Max records per page for network-device
+
+# Health collector: poll interval (seconds), points per InfluxDB write, max buffered points under backpressure
+HEALTH_POLL_INTERVAL = 300
+INFLUX_BATCH_SIZE = 5000
+INFLUX_MAX_BUFFER = 100000
+
+# Catalyst Center tokens are valid for 60 minutes, refresh shortly before that to avoid a 401 round-trip
+TOKEN_LIFETIME = 60 * 60
+TOKEN_REFRESH_MARGIN = 5 * 60
+
+# How many times to back off and retry a throttled (429) request
+MAX_THROTTLE_RETRIES = 5
+DEFAULT_RETRY_AFTER = 10
+
+
+def _parse_retry_after(value):
+    """
+    Parse a Retry-After header (delta seconds or HTTP date) into seconds to wait
+    :param value: Retry-After header value (or None)
+    :return: Seconds to wait before retrying
+    """
+    if not value:
+        return DEFAULT_RETRY_AFTER
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+def _load_json_file(path):
+    """
+    Load a JSON file, returning an empty dict if it does not exist
+    :param path: File path
+    :return: Parsed JSON
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _save_json_file(path, data):
+    """
+    Save data to a compact JSON file
+    :param path: File path
+    :param data: JSON serializable data
+    """
+    with open(path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+
+def _lp_escape(value, chars=", ="):
+    """
+    Escape a measurement, tag key/value or field key for InfluxDB line protocol
+    :param value: Value to escape
+    :param chars: Characters that must be backslash escaped
+    :return: Escaped string
+    """
+    value = str(value)
+    for char in chars:
+        value = value.replace(char, f"\\{char}")
+    return value
+
+
+def to_line_protocol(measurement, tags, fields, timestamp):
+    """
+    Convert a point to InfluxDB line protocol (numbers are always written as floats to keep field types stable)
+    :param measurement: Measurement name
+    :param tags: Dict of tag key -> value (empty values are skipped)
+    :param fields: Dict of field key -> value (None values are skipped)
+    :param timestamp: Timestamp in seconds
+    :return: Line protocol string, or None if there are no fields
+    """
+    field_parts = []
+    for key, value in fields.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        elif isinstance(value, (int, float)):
+            value = repr(float(value))
+        else:
+            value = '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+        field_parts.append(f"{_lp_escape(key)}={value}")
+
+    if not field_parts:
+        return None
+
+    tag_str = "".join(f",{_lp_escape(k)}={_lp_escape(v)}" for k, v in sorted(tags.items()) if v not in (None, ""))
+    return f"{_lp_escape(measurement, ', ')}{tag_str} {','.join(field_parts)} {int(timestamp)}"
+
+
+class InfluxWriter:
+    """
+    Batched InfluxDB v2 line protocol writer (gzip, bounded buffer, Retry-After backoff)
+    """
+
+    def __init__(self, url, token, org, bucket, batch_size=INFLUX_BATCH_SIZE, max_buffer=INFLUX_MAX_BUFFER):
+        self.write_url = f"{url.rstrip('/')}/api/v2/write"
+        self.params = {"org": org, "bucket": bucket, "precision": "s"}
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Token {token}",
+            "Content-Type": "text/plain; charset=utf-8",
+            "Content-Encoding": "gzip",
+        })
+        self.batch_size = batch_size
+
+        # Oldest points are dropped once the buffer is full (InfluxDB down or pushing back for a long time)
+        self.buffer = deque(maxlen=max_buffer)
+        self.dropped = 0
+        self.written = 0
+        self.retry_at = 0.0
+
+    def add(self, lines):
+        """
+        Queue line protocol points for the next flush
+        :param lines: Iterable of line protocol strings
+        """
+        for line in lines:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(line)
+
+    def flush(self):
+        """
+        Write buffered points in batches, stop early if InfluxDB pushes back
+        :return: True if the buffer was fully written
+        """
+        while self.buffer:
+            if time.monotonic() < self.retry_at:
+                return False
+
+            batch = [self.buffer[i] for i in range(min(self.batch_size, len(self.buffer)))]
+            body = gzip.compress("\n".join(batch).encode("utf-8"))
+
+            try:
+                response = self.session.post(self.write_url, params=self.params, data=body)
+            except RequestException as e:
+                console.print(f"[red]InfluxDB write failed:[/] {e}")
+                self.retry_at = time.monotonic() + DEFAULT_RETRY_AFTER
+                return False
+
+            # Backpressure: keep the batch and wait before the next attempt
+            if response.status_code in (429, 503):
+                delay = _parse_retry_after(response.headers.get("Retry-After"))
+                console.print(f"[yellow]InfluxDB is busy (HTTP {response.status_code}), retrying in {delay:.1f}s...[/]")
+                self.retry_at = time.monotonic() + delay
+                return False
+
+            for _ in batch:
+                self.buffer.popleft()
+
+            if response.status_code >= 400:
+                # Bad data will never be accepted, drop the batch rather than retrying forever
+                console.print(f"[red]InfluxDB rejected batch:[/] HTTP {response.status_code} - {response.text}")
+                self.dropped += len(batch)
+                continue
+
+            self.written += len(batch)
+
+        return True
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket to pace requests for an endpoint family
+    """
+
+    def __init__(self, rate_per_minute, burst=1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a request is allowed
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Hold all requests for this family (server asked us to back off via Retry-After)
+        :param seconds: Seconds to wait
+        """
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class TopologyGraph:
+    """
+    In-memory graph of the Catalyst Center physical topology (adjacency lists keyed by device ID and port)
+    """
+
+    def __init__(self, nodes, links, fetched_at=None):
+        """
+        :param nodes: Dict of node ID -> node attributes (label, ip, deviceType, ...)
+        :param links: List of links (source, target, startPortName, endPortName, linkStatus)
+        :param fetched_at: Epoch time the topology was fetched from Catalyst Center (defaults to now)
+        """
+        self.nodes = nodes
+        self.links = links
+        self.fetched_at = fetched_at or time.time()
+        self.adjacency = {node_id: [] for node_id in nodes}
+        self.ports = {}
+        self.by_label = {}
+        self.by_ip = {}
+
+        for node_id, node in nodes.items():
+            if node.get("label"):
+                self.by_label[node["label"]] = node_id
+            if node.get("ip"):
+                self.by_ip[node["ip"]] = node_id
+
+        for link in links:
+            src, dst = link["source"], link["target"]
+            src_port, dst_port = link.get("startPortName"), link.get("endPortName")
+            # Links without a status are treated as up
+            up = (link.get("linkStatus") or "up").lower() == "up"
+
+            # Links are undirected, index both directions
+            self.adjacency.setdefault(src, []).append((dst, src_port, dst_port, up))
+            self.adjacency.setdefault(dst, []).append((src, dst_port, src_port, up))
+            self.ports[(src, src_port)] = (dst, src_port, dst_port, up)
+            self.ports[(dst, dst_port)] = (src, dst_port, src_port, up)
+
+        # Topology version: stable hash of the link set, changes whenever cabling or link state changes
+        link_keys = sorted(
+            f"{link['source']}|{link.get('startPortName')}|{link['target']}|{link.get('endPortName')}|"
+            f"{link.get('linkStatus')}" for link in links
+        )
+        self.version = hashlib.sha1("\n".join(link_keys).encode()).hexdigest()
+
+        self._components = None
+
+    @classmethod
+    def from_physical_topology(cls, physical_response):
+        """
+        Build the graph from a topology/physical-topology response
+        :param physical_response: 'response' body of topology/physical-topology
+        :return: TopologyGraph
+        """
+        nodes = {
+            node["id"]: {
+                "label": node.get("label"),
+                "ip": node.get("ip"),
+                "deviceType": node.get("deviceType"),
+                "family": node.get("family"),
+            }
+            for node in physical_response["nodes"]
+        }
+        links = [
+            {
+                "source": link["source"],
+                "target": link["target"],
+                "startPortName": link.get("startPortName"),
+                "endPortName": link.get("endPortName"),
+                "linkStatus": link.get("linkStatus"),
+            }
+            for link in physical_response["links"]
+        ]
+        return cls(nodes, links)
+
+    def save(self, path):
+        """
+        Serialize the graph to a compact JSON snapshot
+        :param path: Snapshot file path
+        """
+        _save_json_file(path, {"version": self.version, "fetchedAt": self.fetched_at,
+                               "nodes": self.nodes, "links": self.links})
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a graph from a snapshot written by save()
+        :param path: Snapshot file path
+        :return: TopologyGraph
+        """
+        snapshot = _load_json_file(path)
+        # Snapshots written before fetchedAt was recorded fall back to the file's modification time
+        return cls(snapshot["nodes"], snapshot["links"], snapshot.get("fetchedAt") or os.path.getmtime(path))
+
+    @property
+    def age(self):
+        """
+        Seconds since the topology was fetched from Catalyst Center
+        """
+        return time.time() - self.fetched_at
+
+    def resolve(self, device):
+        """
+        Resolve a device ID, hostname label or management IP to a node ID
+        :param device: Device ID, label or IP
+        :return: Node ID or None
+        """
+        if device in self.nodes:
+            return device
+        return self.by_label.get(device) or self.by_ip.get(device)
+
+    def neighbors(self, device_id, port=None, up_only=False):
+        """
+        Get neighbors of a device, or the neighbor on a specific port
+        :param device_id: Node ID
+        :param port: Optional local port name
+        :param up_only: Only follow links that are up
+        :return: List of (neighbor ID, local port, remote port, up)
+        """
+        if port is not None:
+            entry = self.ports.get((device_id, port))
+            return [entry] if entry and (entry[3] or not up_only) else []
+
+        return [entry for entry in self.adjacency.get(device_id, []) if entry[3] or not up_only]
+
+    def connected_components(self):
+        """
+        Get connected components over links that are up (computed once, then cached)
+        :return: Dict of node ID -> component index
+        """
+        if self._components is not None:
+            return self._components
+
+        components = {}
+        index = 0
+        for start in self.adjacency:
+            if start in components:
+                continue
+            index += 1
+            components[start] = index
+            queue = deque([start])
+            while queue:
+                current = queue.popleft()
+                for neighbor, _, _, up in self.adjacency[current]:
+                    if up and neighbor not in components:
+                        components[neighbor] = index
+                        queue.append(neighbor)
+
+        self._components = components
+        return components
+
+    def is_reachable(self, src, dst):
+        """
+        Check if two devices are in the same connected component (O(1) after the first call)
+        :param src: Source node ID
+        :param dst: Destination node ID
+        :return: True if reachable over up links
+        """
+        components = self.connected_components()
+        return src in components and components.get(src) == components.get(dst)
+
+    def shortest_path(self, src, dst):
+        """
+        Find the shortest hop path between two devices over up links (BFS)
+        :param src: Source node ID
+        :param dst: Destination node ID
+        :return: List of (node ID, egress port) hops ending at dst, or None if unreachable
+        """
+        if not self.is_reachable(src, dst):
+            return None
+
+        previous = {src: None}
+        queue = deque([src])
+        while queue:
+            current = queue.popleft()
+            if current == dst:
+                break
+            for neighbor, local_port, _, up in self.adjacency[current]:
+                if up and neighbor not in previous:
+                    previous[neighbor] = (current, local_port)
+                    queue.append(neighbor)
+
+        # Walk back from destination to build the path
+        path = [(dst, None)]
+        hop = previous[dst]
+        while hop:
+            node_id, port = hop
+            path.append((node_id, port))
+            hop = previous[node_id]
+        return list(reversed(path))
+
+
+class DeviceInventoryStore:
+    """
+    Local SQLite snapshot of the network device inventory (keyed by device ID)
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS devices (id TEXT PRIMARY KEY, last_update_time INTEGER, data TEXT)"
+        )
+
+    def last_update_times(self):
+        """
+        Get the last update time of every device in the snapshot
+        :return: Dict of device ID -> lastUpdateTime
+        """
+        return dict(self.conn.execute("SELECT id, last_update_time FROM devices"))
+
+    def apply(self, changed_devices, removed_ids):
+        """
+        Upsert changed devices and delete removed ones in a single transaction
+        :param changed_devices: List of device dicts (added or updated)
+        :param removed_ids: List of device IDs no longer in Catalyst Center
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO devices (id, last_update_time, data) VALUES (?, ?, ?)",
+                [(d["id"], d.get("lastUpdateTime"), json.dumps(d)) for d in changed_devices]
+            )
+            self.conn.executemany("DELETE FROM devices WHERE id = ?", [(device_id,) for device_id in removed_ids])
+
+    def close(self):
+        self.conn.close()
+
 
 class CAT_CENTER:
     """
     Class to interact with Cisco Catalyst Center API (no SDK)
     """
 
-    def __init__(self, host, username, password):
+    def __init__(self, host, username, password, rate_limits=None):
         self.host = host
         self.username = username
         self.password = password
@@ -37,12 +516,47 @@ class CAT_CENTER:
         self.session = requests.Session()
         self.session.verify = False  # Disable SSL verification (adjust as needed)
         self.token = None
+        self.token_expires_at = 0.0
+        self.auth_lock = threading.Lock()
         self.headers = {
             "Content-Type": "application/json",
             "Accept": "application/json",
             "X-Auth-Token": self.token
         }
 
+        # One token bucket per endpoint family
+        self.rate_limits = dict(RATE_LIMITS, **(rate_limits or {}))
+        self.buckets = {family: TokenBucket(*limit) for family, limit in self.rate_limits.items()}
+
+        # Physical topology graph (built by get_topology or load_topology)
+        self.topology = None
+
+    def _bucket_for(self, method, endpoint):
+        """
+        Get the token bucket for a request: its method and endpoint family (e.g., "POST flow-analysis"), else its
+        endpoint family (e.g., "task/1234" -> "task")
+        :param method: HTTP method
+        :param endpoint: API endpoint
+        :return: TokenBucket
+        """
+        family = endpoint.strip("/").split("/")[0].split("?")[0]
+        return self.buckets.get(f"{method.upper()} {family}") or self.buckets.get(family, self.buckets["default"])
+
+    def _ensure_token(self):
+        """
+        Refresh the token shortly before it expires (proactive, instead of waiting for a 401)
+        """
+        if self.token and time.time() < self.token_expires_at - TOKEN_REFRESH_MARGIN:
+            return
+
+        with self.auth_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self.token and time.time() < self.token_expires_at - TOKEN_REFRESH_MARGIN:
+                return
+            if self.token:
+                console.print("[yellow]Token expiring soon, refreshing...[/]")
+            self.login()
+
     def _request(self, method, endpoint, data=None, params=None, auto_retry=True):
         """
         Internal helper to send HTTP requests, check HTTP status, parse JSON, and handle errors
@@ -50,27 +564,45 @@ class CAT_CENTER:
         :param endpoint: API endpoint (e.g., "network-device")
         :param data: JSON body for POST/PUT requests
         :param params: URL parameters
-        :param auto_retry: Retry on 401 Unauthorized
+        :param auto_retry: Retry on 401 Unauthorized (429 Too Many Requests is always retried after Retry-After)
         :return: Parsed JSON response or raw text
         """
         url = f"{self.base_url}/{endpoint}"
-        self.headers["X-Auth-Token"] = self.token  # Always update in case it changed
-
-        try:
-            response = self.session.request(
-                method=method.upper(),
-                url=url,
-                headers=self.headers,
-                json=data,
-                params=params
-            )
-        except RequestException as e:
-            raise Exception(f"Request failed: {e}")
+        self._ensure_token()
+        bucket = self._bucket_for(method, endpoint)
+
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            # Wait for our client-side rate limit first
+            bucket.acquire()
+            # Remember which token this request used (see the 401 handling below)
+            headers = self.headers
+
+            try:
+                response = self.session.request(
+                    method=method.upper(),
+                    url=url,
+                    headers=headers,
+                    json=data,
+                    params=params
+                )
+            except RequestException as e:
+                raise Exception(f"Request failed: {e}")
+
+            # Handle throttling, honour Retry-After for every request in this family
+            if response.status_code == 429 and attempt < MAX_THROTTLE_RETRIES:
+                delay = _parse_retry_after(response.headers.get("Retry-After"))
+                console.print(f"[yellow]Rate limited on {endpoint}, retrying in {delay:.1f}s...[/]")
+                bucket.pause(delay)
+                continue
+            break
 
         # Handle unauthorized error (trigger re-auth once)
         if response.status_code == 401 and auto_retry:
-            console.print("[yellow]Token expired, re-authenticating...[/]")
-            self.login()
+            with self.auth_lock:
+                # Concurrent requests that got a 401 for the same token only log in once
+                if self.token == headers["X-Auth-Token"]:
+                    console.print("[yellow]Token expired, re-authenticating...[/]")
+                    self.login()
             return self._request(method, endpoint, data, params, auto_retry=False)
 
         if response.status_code >= 400:
@@ -98,9 +630,27 @@ class CAT_CENTER:
             raise Exception(f"Login failed: {response.status_code} - {response.text}")
 
         self.token = response.json()["Token"]
-        self.headers["X-Auth-Token"] = self.token
+        self.token_expires_at = time.time() + TOKEN_LIFETIME
+        # Swap in a new dict rather than mutating the one other threads are sending with
+        self.headers = dict(self.headers, **{"X-Auth-Token": self.token})
         console.print(f"[green]Authenticated with Catalyst Center[/]: {self.token}")
 
+    def _get_paged(self, endpoint, params=None, limit=PAGE_LIMIT):
+        """
+        Yield every record of a paged list endpoint (Catalyst Center offsets start at 1)
+        :param endpoint: API endpoint (e.g., "network-device")
+        :param params: Additional URL parameters
+        :param limit: Records per page
+        """
+        offset = 1
+        while True:
+            page = self._request("GET", endpoint, params=dict(params or {}, offset=offset, limit=limit))['response']
+            yield from page
+
+            if len(page) < limit:
+                return
+            offset += limit
+
     def get_network_device_list(self):
         """
         Get a list of all compute blades
@@ -132,6 +682,68 @@ class CAT_CENTER:
 
         return devices
 
+    def sync_device_inventory(self, db_path=INVENTORY_DB, changes_path=INVENTORY_CHANGES):
+        """
+        Delta sync the network device inventory into a local SQLite snapshot, publish the change set
+        :param db_path: SQLite snapshot path
+        :param changes_path: JSON Lines file the change set is appended to
+        :return: Change set dict (added, updated, removed)
+        """
+        store = DeviceInventoryStore(db_path)
+        try:
+            known = store.last_update_times()
+
+            # Compare lastUpdateTime per device, only changed devices are stored and published
+            seen = set()
+            added, updated = [], []
+            for device in self._get_paged("network-device"):
+                device_id = device["id"]
+                seen.add(device_id)
+
+                if device_id not in known:
+                    added.append(device)
+                elif known[device_id] != device.get("lastUpdateTime"):
+                    updated.append(device)
+
+            # Anything in the snapshot that was not listed has been removed
+            removed = [device_id for device_id in known if device_id not in seen]
+
+            store.apply(added + updated, removed)
+        finally:
+            store.close()
+
+        change_set = {
+            "timestamp": int(time.time() * 1000),
+            "total": len(seen),
+            "added": added,
+            "updated": updated,
+            "removed": removed,
+        }
+
+        if added or updated or removed:
+            with open(changes_path, "a") as f:
+                f.write(json.dumps(change_set) + "\n")
+
+        # Show the first changes only, a first sync of a large inventory adds every device
+        rows = [("Added", d.get("hostname") or d["id"]) for d in added]
+        rows += [("Updated", d.get("hostname") or d["id"]) for d in updated]
+        rows += [("[red]Removed[/]", device_id) for device_id in removed]
+        if rows:
+            table = Table(title="Device Inventory Sync")
+            table.add_column("Change", style="bold")
+            table.add_column("Hostname / ID", style="cyan")
+
+            for row in rows[:50]:
+                table.add_row(*row)
+            if len(rows) > 50:
+                table.add_row("...", f"{len(rows) - 50} more")
+
+            console.print(table)
+        console.print(f"[green]{len(seen)} devices:[/] {len(added)} added, {len(updated)} updated, "
+                      f"{len(removed)} removed, {len(seen) - len(added) - len(updated)} unchanged")
+
+        return change_set
+
     def get_topology(self):
         """
         Get the physical and logical topology
@@ -153,8 +765,12 @@ class CAT_CENTER:
         physical_endpoint = "topology/physical-topology"
         physical_response = self._request("GET", physical_endpoint)['response']
 
+        # Build (and snapshot) the indexed topology graph for local reachability / path queries
+        self.topology = TopologyGraph.from_physical_topology(physical_response)
+        self.topology.save(TOPOLOGY_SNAPSHOT)
+
         # Create node ID to label map
-        nodes = {node['id']: node['label'] for node in physical_response['nodes']}
+        nodes = {node_id: node['label'] for node_id, node in self.topology.nodes.items()}
 
         # Build link table
         link_table = Table(title="Physical Topology Links", show_lines=True)
@@ -176,6 +792,62 @@ class CAT_CENTER:
             )
 
         console.print(link_table)
+        console.print(f"[green]Topology graph:[/] {len(self.topology.nodes)} devices, {len(self.topology.links)} links, "
+                      f"{len(set(self.topology.connected_components().values()))} components "
+                      f"(version {self.topology.version[:12]})")
+
+        return self.topology
+
+    def load_topology(self, refresh=False, max_age=TOPOLOGY_MAX_AGE):
+        """
+        Get the physical topology graph, from memory, the local snapshot, or Catalyst Center (in that order)
+        :param refresh: Always re-fetch topology/physical-topology
+        :param max_age: Re-fetch if the in-memory graph or snapshot is older than this many seconds
+        :return: TopologyGraph
+        """
+        if self.topology and not refresh and self.topology.age <= max_age:
+            return self.topology
+
+        if not refresh and os.path.exists(TOPOLOGY_SNAPSHOT):
+            snapshot = TopologyGraph.load(TOPOLOGY_SNAPSHOT)
+            if snapshot.age <= max_age:
+                console.print(f"[dim]Using topology snapshot from {snapshot.age / 60:.0f} minutes ago[/]")
+                self.topology = snapshot
+                return self.topology
+            console.print(f"[yellow]Topology snapshot is {snapshot.age / 60:.0f} minutes old, re-fetching...[/]")
+
+        physical_response = self._request("GET", "topology/physical-topology")['response']
+        self.topology = TopologyGraph.from_physical_topology(physical_response)
+        self.topology.save(TOPOLOGY_SNAPSHOT)
+        return self.topology
+
+    def query_topology(self):
+        """
+        Check reachability and find the shortest path between two devices using the local topology graph
+        """
+        refresh = Confirm.ask("Refresh topology from Catalyst Center?", default=False)
+        topology = self.load_topology(refresh=refresh)
+
+        src = topology.resolve(Prompt.ask("Source device (hostname, IP or ID)"))
+        dest = topology.resolve(Prompt.ask("Destination device (hostname, IP or ID)"))
+        if not src or not dest:
+            console.print("[red]Device not found in topology.[/]")
+            return
+
+        path = topology.shortest_path(src, dest)
+        if path is None:
+            console.print("[red]Devices are not connected in the physical topology (over up links).[/]")
+            return
+
+        table = Table(title=f"Shortest Path ({len(path) - 1} hops)", show_lines=True)
+        table.add_column("Hop", style="dim")
+        table.add_column("Device", style="cyan")
+        table.add_column("Egress Port", style="magenta")
+
+        for idx, (node_id, port) in enumerate(path):
+            table.add_row(str(idx), topology.nodes[node_id].get('label') or node_id, port or "-")
+
+        console.print(table)
 
     def get_site_health(self):
         """
@@ -221,6 +893,101 @@ class CAT_CENTER:
 
         console.print(table)
 
+    def collect_health_points(self):
+        """
+        Poll site-health and device-health and convert the responses to InfluxDB line protocol
+        :return: List of line protocol strings
+        """
+        timestamp = time.time()
+        lines = []
+
+        for site in self._request("GET", "site-health")['response']:
+            lines.append(to_line_protocol(
+                "catalyst_site_health",
+                {"site_name": site.get("siteName"), "site_type": site.get("siteType")},
+                {
+                    "network_health_average": site.get("networkHealthAverage"),
+                    "network_health_access": site.get("networkHealthAccess"),
+                    "network_health_switch": site.get("networkHealthSwitch"),
+                    "network_health_router": site.get("networkHealthRouter"),
+                    "network_health_ap": site.get("networkHealthAP"),
+                    "access_good_count": site.get("accessGoodCount"),
+                    "access_total_count": site.get("accessTotalCount"),
+                    "switch_good_count": site.get("switchDeviceGoodCount"),
+                    "switch_total_count": site.get("switchDeviceTotalCount"),
+                    "router_good_count": site.get("routerGoodCount"),
+                    "router_total_count": site.get("routerTotalCount"),
+                    "ap_good_count": site.get("apDeviceGoodCount"),
+                    "ap_total_count": site.get("apDeviceTotalCount"),
+                },
+                timestamp
+            ))
+
+        for device in self._get_paged("device-health"):
+            reachability = device.get("reachabilityHealth")
+            lines.append(to_line_protocol(
+                "catalyst_device_health",
+                {
+                    "hostname": device.get("name"),
+                    "ip": device.get("ipAddress"),
+                    "family": device.get("deviceFamily"),
+                    "location": device.get("location"),
+                },
+                {
+                    "overall_health": device.get("overallHealth"),
+                    # The API spells this one 'cpuUlitilization'
+                    "cpu_utilization": device.get("cpuUlitilization", device.get("cpuUtilization")),
+                    "memory_utilization": device.get("memoryUtilization"),
+                    "interface_link_err_health": device.get("interfaceLinkErrHealth"),
+                    "reachable": None if reachability is None else float(reachability == "REACHABLE"),
+                },
+                timestamp
+            ))
+
+        return [line for line in lines if line]
+
+    def run_health_collector(self, interval=HEALTH_POLL_INTERVAL, writer=None, iterations=None):
+        """
+        Long-running collector: poll site and device health on a schedule, write to InfluxDB in gzip batches
+        :param interval: Seconds between polls
+        :param writer: InfluxWriter (defaults to the INFLUXDB_* env variables)
+        :param iterations: Stop after this many polls (None runs until Ctrl+C)
+        """
+        if writer is None:
+            missing = [name for name, value in (("INFLUXDB_URL", INFLUXDB_URL), ("INFLUXDB_TOKEN", INFLUXDB_TOKEN),
+                                                ("INFLUXDB_ORG", INFLUXDB_ORG), ("INFLUXDB_BUCKET", INFLUXDB_BUCKET))
+                       if not value]
+            if missing:
+                console.print(f"[red]Health collector needs {', '.join(missing)} set in .env[/]")
+                exit(1)
+            writer = InfluxWriter(INFLUXDB_URL, INFLUXDB_TOKEN, INFLUXDB_ORG, INFLUXDB_BUCKET)
+        console.print(f"[green]Health collector started[/] (every {interval}s -> {writer.write_url}), Ctrl+C to stop")
+
+        count = 0
+        try:
+            while iterations is None or count < iterations:
+                started = time.monotonic()
+                count += 1
+
+                try:
+                    lines = self.collect_health_points()
+                    writer.add(lines)
+                    console.print(f"[cyan]Poll {count}:[/] {len(lines)} points collected")
+                except Exception as e:
+                    # Keep collecting, one failed poll should not stop the collector
+                    console.print(f"[red]Poll {count} failed:[/] {e}")
+
+                writer.flush()
+                console.print(f"[dim]InfluxDB: {writer.written} written, {len(writer.buffer)} buffered, "
+                              f"{writer.dropped} dropped[/]")
+
+                if iterations is None or count < iterations:
+                    time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            console.print("[yellow]Stopping health collector...[/]")
+
+        writer.flush()
+
     def execute_command_runner(self):
         """
         Execute a command via the Command Runner API
@@ -336,14 +1103,44 @@ class CAT_CENTER:
         # Step 3: Select one or more device indices
         selected_index = Prompt.ask("Select a source device (by index)", default="1",
                                     choices=[str(i) for i in range(1, len(devices) + 1)])
-        src_ip = devices[int(selected_index) - 1]["managementIpAddress"]
+        src_device = devices[int(selected_index) - 1]
+        src_ip = src_device["managementIpAddress"]
 
         # Step 4: Input destination IP address
         selected_index = Prompt.ask("Select a dest device (by index)", default="2",
                                     choices=[str(i) for i in range(1, len(devices) + 1)])
-        dest_ip = devices[int(selected_index) - 1]["managementIpAddress"]
+        dest_device = devices[int(selected_index) - 1]
+        dest_ip = dest_device["managementIpAddress"]
+
+        # Pre-check reachability locally before spending a slow flow-analysis call
+        topology = self.load_topology()
+        src_id, dest_id = topology.resolve(src_device["id"]), topology.resolve(dest_device["id"])
+        if src_id and dest_id and not topology.is_reachable(src_id, dest_id):
+            console.print("[yellow]Source and destination are not connected in the physical topology.[/]")
+            if not Confirm.ask("Run path trace anyway?", default=False):
+                return
+
+        # Step 5: Run the path trace, poll for results
+        console.print("[yellow]Polling for task completion...[/]")
+        path_trace_result = self._run_flow_analysis(src_ip, dest_ip)
 
-        # Step 5: Run the path trace
+        # Step 6: Display path trace results
+        if path_trace_result:
+            # Success!
+            console.print("[green]Path Trace Results:[/green]")
+            console.print(json.dumps(path_trace_result, indent=4))
+        else:
+            console.print("[red]Path trace did not complete.[/]")
+
+    def _run_flow_analysis(self, src_ip, dest_ip, max_polls=10, poll_interval=2):
+        """
+        Submit a flow analysis (path trace) and poll its task until it completes
+        :param src_ip: Source IP address
+        :param dest_ip: Destination IP address
+        :param max_polls: Maximum number of task polls
+        :param poll_interval: Seconds between polls
+        :return: Path trace result ('response' of flow-analysis/{id}), or None if it failed or did not complete
+        """
         endpoint = "flow-analysis"
         payload = {
             "sourceIP": src_ip,
@@ -361,26 +1158,119 @@ class CAT_CENTER:
         flow_analysis_id = response['flowAnalysisId']
         task_id = response['taskId']
 
-        # Step 6: Poll for results
-        console.print("[yellow]Polling for task completion...[/]")
-        for _ in range(10):
-            time.sleep(2)  # Wait between polls
+        for _ in range(max_polls):
+            time.sleep(poll_interval)  # Wait between polls
             task_result = self._request("GET", f"task/{task_id}")['response']  # Adjust prefix if needed
 
             isError = task_result.get("isError", False)
             endTime = task_result.get("endTime", None)
 
-            if not isError and endTime:
-                task_id = task_result.get("progress", "")
-                console.print(f"[green]Task completed successfully![/]")
-                break
+            if isError:
+                return None
 
-        # Step 7: Retrieve path trace results
-        if task_id == flow_analysis_id:
-            # Success!
-            console.print("[green]Path Trace Results:[/green]")
-            path_trace_result = self._request("GET", f"flow-analysis/{flow_analysis_id}")['response']
-            console.print(json.dumps(path_trace_result, indent=4))
+            if endTime:
+                # On success, the task progress is the flow analysis ID
+                if task_result.get("progress", "") != flow_analysis_id:
+                    return None
+                return self._request("GET", f"flow-analysis/{flow_analysis_id}")['response']
+
+        return None
+
+    def bulk_path_trace(self, csv_path=None, output_path=None, max_workers=BULK_TRACE_WORKERS):
+        """
+        Run path traces for many source/destination pairs concurrently
+        :param csv_path: CSV file with 'Source' and 'Destination' IP columns
+        :param output_path: JSON Lines file, one result per pair (written as each trace completes)
+        :param max_workers: Maximum number of flow analyses in flight at once
+        """
+        csv_path = csv_path or Prompt.ask("CSV of source/destination pairs", default="path_trace_pairs.csv")
+        output_path = output_path or Prompt.ask("Results file (JSON Lines)", default="path_trace_results.jsonl")
+
+        # Step 1: Read (and de-duplicate) pairs
+        with open(csv_path, "r") as file:
+            pairs = list(dict.fromkeys(
+                (row["Source"].strip(), row["Destination"].strip()) for row in csv.DictReader(file)
+            ))
+
+        # Step 2: Refresh topology, the cache is only valid for the current topology version
+        topology = self.load_topology(refresh=True)
+        # Results for older topology versions can never be served again, drop them so the cache doesn't grow forever
+        cache = {key: result for key, result in _load_json_file(PATH_TRACE_CACHE).items()
+                 if result.get("topologyVersion") == topology.version}
+
+        stats = {"COMPLETED": 0, "FAILED": 0, "UNREACHABLE": 0, "CACHED": 0}
+        start = time.monotonic()
+
+        with open(output_path, "w") as output:
+            def write_result(result):
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+
+            # Step 3: Serve unchanged pairs from cache, skip pairs that are not connected locally
+            pending = []
+            for src_ip, dest_ip in pairs:
+                key = f"{src_ip}|{dest_ip}|{topology.version}"
+                if key in cache:
+                    stats["CACHED"] += 1
+                    write_result(dict(cache[key], cached=True))
+                    continue
+
+                src_id, dest_id = topology.resolve(src_ip), topology.resolve(dest_ip)
+                if src_id and dest_id and not topology.is_reachable(src_id, dest_id):
+                    stats["UNREACHABLE"] += 1
+                    write_result({"source": src_ip, "destination": dest_ip, "status": "UNREACHABLE",
+                                  "topologyVersion": topology.version, "result": None, "cached": False})
+                    continue
+
+                pending.append((key, src_ip, dest_ip))
+
+            console.print(f"[yellow]{len(pairs)} pairs: {stats['CACHED']} cached, {stats['UNREACHABLE']} unreachable, "
+                          f"{len(pending)} to trace ({max_workers} at a time)...[/]")
+
+            # Step 4: Submit the rest concurrently, write results as they complete
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._run_flow_analysis, src_ip, dest_ip): (key, src_ip, dest_ip)
+                    for key, src_ip, dest_ip in pending
+                }
+
+                try:
+                    for future in as_completed(futures):
+                        key, src_ip, dest_ip = futures[future]
+                        try:
+                            path_trace_result = future.result()
+                            error = None
+                        except Exception as e:
+                            path_trace_result = None
+                            error = str(e)
+
+                        status = "COMPLETED" if path_trace_result else "FAILED"
+                        stats[status] += 1
+                        result = {"source": src_ip, "destination": dest_ip, "status": status,
+                                  "topologyVersion": topology.version, "result": path_trace_result}
+                        if error:
+                            result["error"] = error
+
+                        write_result(dict(result, cached=False))
+                        console.print(f"[{'green' if path_trace_result else 'red'}]{status}[/]: {src_ip} -> {dest_ip}")
+
+                        # Only cache successful traces, failures are retried on the next run
+                        if path_trace_result:
+                            cache[key] = result
+                finally:
+                    # Keep every completed trace if the run is cut short (Ctrl+C or an error), and don't wait for
+                    # traces that haven't started
+                    for future in futures:
+                        future.cancel()
+                    _save_json_file(PATH_TRACE_CACHE, cache)
+
+        # Step 5: Summary
+        table = Table(title=f"Bulk Path Trace Summary ({time.monotonic() - start:.1f}s)")
+        for status in stats:
+            table.add_column(status.title(), justify="right")
+        table.add_row(*[str(count) for count in stats.values()])
+        console.print(table)
+        console.print(f"[green]Results written to[/] {output_path}")
 
 
 def main_menu(cat_center):
@@ -394,6 +1284,10 @@ def main_menu(cat_center):
         "3": ("Get Site Health", cat_center.get_site_health),
         "4": ("Path Trace", cat_center.path_trace),
         "5": ("Get Physical, Logical Topology", cat_center.get_topology),
+        "6": ("Query Topology Graph (Reachability, Shortest Path)", cat_center.query_topology),
+        "7": ("Bulk Path Trace from CSV", cat_center.bulk_path_trace),
+        "8": ("Sync Device Inventory (Delta)", cat_center.sync_device_inventory),
+        "9": ("Run Health Collector (InfluxDB)", cat_center.run_health_collector),
         # Add more entries as needed
     }
 
@@ -1,9 +1,17 @@
+import argparse
 import csv
+import json
 import os
+import threading
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Iterator, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 from rich.console import Console
+from rich.table import Table
 from dotenv import load_dotenv
 import ipaddress
 
@@ -21,7 +29,41 @@ fdm_version = os.getenv("FDM_VERSION")
 # Disable warnings for insecure HTTPS requests
 requests.packages.urllib3.disable_warnings()
 
-base_url = f"https://{fdm_host}:{fdm_port}/api/fdm/{fdm_version}"
+# Determine the directory path this script is running in
+script_dir = os.path.dirname(os.path.realpath(__file__))
+
+# Keep-alive connection pool size, on-disk token cache, refresh tokens this many seconds before they expire
+POOL_SIZE = 10
+TOKEN_CACHE = os.path.join(script_dir, ".fdm_token_cache.json")
+TOKEN_REFRESH_MARGIN = 60
+
+# The token cache file is shared by every FDM client (fleet mode runs them in parallel threads)
+_token_cache_lock = threading.Lock()
+
+# Object creation: concurrent workers, retries for transient failures, bulk requests (FDM 6.6+) chunk size
+WORKERS = 8
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+BULK_MIN_VERSION = (6, 6)
+BULK_CHUNK_SIZE = 500
+
+# Items per page for concurrent collection fetches
+PAGE_LIMIT = 1000
+
+# Fleet mode: devices processed at once, deployment polling (adaptive backoff, seconds) and overall deadline
+DEVICE_WORKERS = 10
+DEPLOY_POLL_MIN = 2
+DEPLOY_POLL_MAX = 30
+DEPLOY_POLL_BACKOFF = 1.5
+DEPLOY_DEADLINE = 30 * 60
+DEPLOY_FINAL_STATES = {'DEPLOYED', 'DEPLOY_FAILED', 'DEPLOY_TIMEOUT'}
+
+# CSV validation: valid object types, rows per chunk, files larger than this are validated across a process pool
+VALID_SUBTYPES = {"HOST", "NETWORK", "FQDN", "RANGE"}
+VALIDATION_CHUNK_SIZE = 5000
+PARALLEL_VALIDATION_BYTES = 50 * 1024 * 1024
+REJECTED_REPORT = "rejected_objects.csv"
+REDUNDANCY_REPORT = "redundant_objects.csv"
 
 
 def _is_valid_ip(ip_str):
@@ -33,8 +75,7 @@ def _is_valid_ip(ip_str):
     try:
         ipaddress.ip_address(ip_str)
         return True
-    except ValueError as e:
-        console.print(f"[red]ERROR: Invalid IP address '{ip_str}: {e}'[/red]")
+    except ValueError:
         return False
 
 
@@ -47,219 +88,1160 @@ def _is_valid_network(ip_str):
     try:
         ipaddress.ip_network(ip_str, strict=False)
         return True
-    except ValueError as e:
-        console.print(f"[red]ERROR: Invalid network address '{ip_str}: {e}'[/red]")
+    except ValueError:
         return False
 
 
-def get_token():
-    global token
-    url = f'{base_url}/fdm/token'
-    headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
-    body = {
-        'grant_type': 'password',
-        'username': f'{fdm_user}',
-        'password': f'{fdm_password}',
+def validate_row(row: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Validate a CSV row and convert it to an FDM network object
+    :param row: CSV row (Name, Type, Value, Description)
+    :return: (network object, None) if valid, (None, reason) otherwise
+    """
+    name = (row.get("Name") or "").strip()
+    if not name:
+        return None, "Missing name"
+
+    obj = {
+        "name": name,
+        "description": (row.get("Description") or "").strip(),
+        "type": "networkobject"
     }
-    response = requests.post(url, verify=False, headers=headers, json=body)
-    if response.status_code != 200:
-        console.print(f"[red]ERROR: Failed to get token: {response.status_code} - {response.text}[/red]")
-        return None
 
-    # Set token globally
-    token = response.json().get('access_token')
+    # Check type, convert to FDM format
+    sub_type = (row.get("Type") or "").strip().upper()
+    if sub_type not in VALID_SUBTYPES:
+        return None, f"Invalid type '{sub_type}'"
+
+    obj['subType'] = sub_type
+
+    # Validate object value conforms to rules of FDM
+    value = (row.get("Value") or "").strip()
+    if sub_type == "HOST":
+        if '/' in value:
+            return None, f"Invalid value '{value}'. Must be a single IP address!"
+        if not _is_valid_ip(value):
+            return None, f"Invalid IP address '{value}'"
+
+    elif sub_type == "NETWORK":
+        if '/' not in value:
+            return None, f"Invalid value '{value}'. Must be a network address!"
+        if not _is_valid_network(value):
+            return None, f"Invalid network address '{value}'"
+
+    elif sub_type == "RANGE":
+        if value.count('-') != 1:
+            return None, f"Invalid value '{value}'. Must be a range!"
+
+        start, end = (part.strip() for part in value.split('-'))
+        if not (_is_valid_ip(start) and _is_valid_ip(end)):
+            return None, f"Invalid range '{value}'"
+        value = f"{start}-{end}"
 
-    return token
+    obj['value'] = value
+    return obj, None
 
 
-def fdm_get(token, endpoint):
+def _validate_chunk(chunk: list) -> list:
     """
-    Get data from FDM API
-    :param token: Bearer token for authentication
-    :param endpoint: API endpoint to call
-    :return: JSON response data
+    Validate a chunk of rows (runs in a worker process for large files)
+    :param chunk: List of (line number, row)
+    :return: List of (line number, row, network object, reason)
     """
-    retry_counter = 0
-    all_items = []
-    url = f"{base_url}/{endpoint}"
+    return [(line, row, *validate_row(row)) for line, row in chunk]
 
-    while url and retry_counter < 5:
-        headers = {'Content-Type': 'application/json', 'Accept': 'application/json', 'Authorization': f'Bearer {token}'}
-        response = requests.get(url, verify=False, headers=headers)
-        if response.status_code != 200:
-            console.print(f"[red]ERROR: API call failed: {response.status_code} - {response.text}[/red]")
-            return None
 
-        if response.status_code == 401:
-            retry_counter += 1
+def _read_chunks(csv_path: str, chunk_size: int) -> Iterator[list]:
+    """
+    Stream a CSV file in chunks of rows
+    :param csv_path: CSV file path
+    :param chunk_size: Rows per chunk
+    :return: Generator of lists of (line number, row)
+    """
+    with open(csv_path, 'r', newline='') as file:
+        reader = csv.DictReader(file)
+        chunk = []
+        for row in reader:
+            chunk.append((reader.line_num, row))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
 
-            # Token expired, get a new one, retry call
-            console.print("[yellow]Token expired, acquiring a new token...[/yellow]")
-            token = get_token()
-            continue
+def iter_validated_rows(csv_path: str, workers: Optional[int] = None, chunk_size: int = VALIDATION_CHUNK_SIZE,
+                        parallel: Optional[bool] = None) -> Iterator[tuple]:
+    """
+    Validate a CSV file as a stream, across a process pool for very large files (results stay in file order)
+    :param csv_path: CSV file path
+    :param workers: Worker processes (None uses the CPU count)
+    :param chunk_size: Rows per chunk
+    :param parallel: Use a process pool (None decides by file size)
+    :return: Generator of (line number, row, network object, reason)
+    """
+    if parallel is None:
+        parallel = os.path.getsize(csv_path) > PARALLEL_VALIDATION_BYTES
 
-        # Check Paging
-        data = response.json()
-        if 'items' in data:
-            items = data.get('items', [])
-            all_items.extend(items)
+    chunks = _read_chunks(csv_path, chunk_size)
+    if not parallel:
+        for chunk in chunks:
+            yield from _validate_chunk(chunk)
+        return
 
-            # Extract next URL from paging
-            paging = data.get('paging', {})
-            next_links = paging.get('next', [])
-            url = next_links[0] if next_links else None
-        else:
-            return data
+    # Keep a bounded window of chunks in flight so memory stays flat on huge files
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = deque()
+        for chunk in chunks:
+            window.append(executor.submit(_validate_chunk, chunk))
+            if len(window) >= workers * 2:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
 
-    return all_items
 
+def load_network_objects(csv_path: str, report_path: str = REJECTED_REPORT, workers: Optional[int] = None) -> list:
+    """
+    Validate a CSV of network objects (desired state), skip duplicate names, write rejected rows to a report file
+    :param csv_path: CSV file path (Name, Type, Value, Description)
+    :param report_path: CSV report of rejected rows
+    :param workers: Worker processes for parallel validation
+    :return: List of network objects
+    """
+    network_objects = []
+    seen_names = set()
+    rejected = 0
+
+    with open(report_path, 'w', newline='') as report:
+        writer = csv.writer(report)
+        writer.writerow(["Line", "Name", "Type", "Value", "Description", "Reason"])
 
-def fdm_post(token, endpoint, body):
+        for line, row, obj, reason in iter_validated_rows(csv_path, workers=workers):
+            # Names are hashed, duplicates later in the file are rejected
+            if obj is not None and obj['name'] in seen_names:
+                reason = "Duplicate name in CSV"
+
+            if reason:
+                rejected += 1
+                writer.writerow([line, row.get("Name"), row.get("Type"), row.get("Value"), row.get("Description"),
+                                 reason])
+                continue
+
+            seen_names.add(obj['name'])
+            network_objects.append(obj)
+
+    console.print(f"[green]SUCCESS[/green]: {len(network_objects)} valid objects, {rejected} rejected "
+                  f"(see '{report_path}')")
+    return network_objects
+
+
+def to_address_range(obj: dict) -> Optional[Tuple[int, int, int]]:
     """
-    Post data to FDM API
-    :param token: Bearer token for authentication
-    :param endpoint: API endpoint to call
-    :param body: JSON body to send
-    :return: JSON response data
+    Convert a HOST, NETWORK or RANGE network object to an address range
+    :param obj: Network object (subType, value)
+    :return: (IP version, first address, last address) as integers, None for FQDN or invalid values
     """
-    url = f"{base_url}/{endpoint}"
-    headers = {'Content-Type': 'application/json', 'Accept': 'application/json', 'Authorization': f'Bearer {token}'}
-    response = requests.post(url, verify=False, headers=headers, json=body)
-    if response.status_code != 200:
-        console.print(f"[red]ERROR: API call failed: {response.status_code} - {response.text}[/red]")
+    sub_type, value = obj.get('subType'), (obj.get('value') or "").strip()
+    try:
+        if sub_type == "HOST":
+            address = ipaddress.ip_address(value)
+            return address.version, int(address), int(address)
+
+        if sub_type == "NETWORK":
+            network = ipaddress.ip_network(value, strict=False)
+            return network.version, int(network.network_address), int(network.broadcast_address)
+
+        if sub_type == "RANGE":
+            start, end = (ipaddress.ip_address(part.strip()) for part in value.split('-'))
+            if start.version != end.version or start > end:
+                return None
+            return start.version, int(start), int(end)
+    except ValueError:
         return None
 
-    return response.json()
+    return None
 
 
-if __name__ == "__main__":
-    token = get_token()
-    if token:
-        console.print(f"[green]SUCCESS[/green]: Token acquired: {token}")
-    else:
-        console.print("[red]ERROR[/red]: Failed to acquire token")
-    items = fdm_get(token, "devicesettings/default/devicehostnames")
-    device_hostname = items[0].get('hostname', 'unknown') if items else 'unknown'
-    if device_hostname:
-        console.print(f"[green]SUCCESS[/green]: Device Hostname: {device_hostname}")
+class AddressRangeIndex:
+    """
+    Static interval index over IPv4/IPv6 address ranges: an implicit balanced tree over ranges sorted by first
+    address, where every node also stores the highest last address in its subtree
+    """
 
-    # Get All existing network objects
-    network_objects = fdm_get(token, "object/networks")
-    if network_objects:
-        console.print(f"[green]SUCCESS[/green]: Retrieved existing network objects:")
-        console.print_json(data=network_objects)
+    def __init__(self, objects: list):
+        """
+        :param objects: Network objects (FQDN and invalid values are skipped)
+        """
+        self.trees = {}
+        by_version = {4: [], 6: []}
+        for obj in objects:
+            address_range = to_address_range(obj)
+            if address_range:
+                version, first, last = address_range
+                by_version[version].append((first, last, obj))
 
-    network_object_names = [obj['name'] for obj in network_objects]
+        for version, entries in by_version.items():
+            entries.sort(key=lambda entry: entry[0])
+            firsts = [entry[0] for entry in entries]
+            lasts = [entry[1] for entry in entries]
+            max_lasts = lasts[:]
+            self._build(lasts, max_lasts, 0, len(entries))
+            self.trees[version] = (firsts, lasts, max_lasts, [entry[2] for entry in entries])
 
-    # Read csv, create payloads for objects in FDM format
-    network_objects = []
-    valid_subtypes = ["HOST", "NETWORK", "FQDN", "RANGE"]
-    with open('network_objects.csv', 'r') as file:
-        reader = csv.DictReader(file)
+    def _build(self, lasts: list, max_lasts: list, lo: int, hi: int) -> int:
+        """
+        Compute the subtree max last address for the node at the middle of [lo, hi)
+        :return: Subtree max last address (-1 if empty)
+        """
+        if lo >= hi:
+            return -1
+        mid = (lo + hi) // 2
+        max_lasts[mid] = max(lasts[mid], self._build(lasts, max_lasts, lo, mid),
+                             self._build(lasts, max_lasts, mid + 1, hi))
+        return max_lasts[mid]
 
-        for row in reader:
-            # Check if object already exists!
-            if row["Name"].strip() in network_object_names:
-                console.print(f"[yellow]WARNING[/yellow]: Object '{row['Name']}' already exists, skipping...")
+    def overlapping(self, version: int, first: int, last: int) -> list:
+        """
+        Find every indexed object whose range overlaps [first, last] in O(log n + k)
+        :param version: IP version
+        :param first: First address (integer)
+        :param last: Last address (integer)
+        :return: List of (first, last, object)
+        """
+        firsts, lasts, max_lasts, objects = self.trees[version]
+        found = []
+
+        stack = [(0, len(firsts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
                 continue
+            mid = (lo + hi) // 2
 
-            obj = {
-                "name": row["Name"].strip(),
-                "description": row["Description"].strip(),
-                "type": "networkobject"
-            }
+            # Nothing in this subtree ends at or after our first address
+            if max_lasts[mid] < first:
+                continue
+
+            stack.append((lo, mid))
+            if firsts[mid] <= last:
+                if lasts[mid] >= first:
+                    found.append((firsts[mid], lasts[mid], objects[mid]))
+                # Right subtree starts after mid, only useful if mid still starts before our last address
+                stack.append((mid + 1, hi))
+
+        return found
+
+
+def find_redundancies(desired: list, existing: list) -> list:
+    """
+    Find desired objects that duplicate or overlap existing objects or other desired objects
+    :param desired: Desired network objects (from the CSV)
+    :param existing: Existing network objects (from object/networks, system-defined objects are ignored)
+    :return: List of (desired object, other object, source, relation)
+    """
+    desired_names = {obj['name'] for obj in desired}
+
+    # Existing objects with a desired name are replaced by their desired state
+    sources = {}
+    indexed = []
+    for obj in existing:
+        if not obj.get('isSystemDefined') and obj['name'] not in desired_names:
+            sources[id(obj)] = "existing"
+            indexed.append(obj)
+    for obj in desired:
+        sources[id(obj)] = "csv"
+        indexed.append(obj)
+
+    index = AddressRangeIndex(indexed)
+    redundancies = []
+    for obj in desired:
+        address_range = to_address_range(obj)
+        if not address_range:
+            continue
 
-            # Check type, convert to FDM format
-            subType = row['Type'].strip().upper()
-            if subType not in valid_subtypes:
-                console.print(f"[red]ERROR[/red]: Invalid type '{subType}' for object '{row['Name']}'")
+        version, first, last = address_range
+        for other_first, other_last, other in index.overlapping(version, first, last):
+            if other is obj:
                 continue
 
-            obj['subType'] = subType
+            if (other_first, other_last) == (first, last):
+                relation = "duplicate"
+            elif other_first <= first and last <= other_last:
+                relation = "contained by"
+            elif first <= other_first and other_last <= last:
+                relation = "contains"
+            else:
+                relation = "overlaps"
+            redundancies.append((obj, other, sources[id(other)], relation))
+
+    return redundancies
 
-            # Validate object value conforms to rules of FDM
-            if subType == "HOST":
-                value = row["Value"].strip()
 
-                if '/' in value:
-                    console.print(f"[red]ERROR[/red]: Invalid value '{obj['value']}' for object '{row['Name']}'. Must be a single IP address!")
-                    continue
+def write_redundancy_report(redundancies: list, report_path: str):
+    """
+    Write a CSV report of overlapping and duplicate network objects
+    :param redundancies: Result of find_redundancies
+    :param report_path: CSV report path
+    """
+    with open(report_path, 'w', newline='') as report:
+        writer = csv.writer(report)
+        writer.writerow(["Name", "Value", "Relation", "Other Name", "Other Value", "Other Source"])
+        for obj, other, source, relation in redundancies:
+            writer.writerow([obj['name'], obj['value'], relation, other['name'], other.get('value'), source])
+
+
+def _object_key(obj: dict) -> tuple:
+    """
+    Value index key of a network object
+    :param obj: Network object
+    :return: (subType, value)
+    """
+    return obj.get('subType'), obj.get('value')
+
+
+def _needs_update(current: dict, desired: dict) -> bool:
+    """
+    Check if an existing network object differs from its desired state
+    :param current: Existing network object (from FDM)
+    :param desired: Desired network object (from the CSV)
+    :return: True if an update is needed
+    """
+    return (
+        _object_key(current) != _object_key(desired)
+        or (current.get('description') or "") != (desired.get('description') or "")
+    )
+
+
+def plan_network_objects(desired: list, existing: list, prune: bool = False) -> dict:
+    """
+    Diff desired network objects against existing ones (indexed by name and by value) into a minimal plan
+    :param desired: Desired network objects (from the CSV)
+    :param existing: Existing network objects (from object/networks)
+    :param prune: Delete user-defined objects that are not in the CSV
+    :return: Plan dict (create: [desired], update: [(existing, desired)], delete: [existing])
+    """
+    existing_by_name = {obj['name']: obj for obj in existing}
+    desired_names = {obj['name'] for obj in desired}
+
+    # Stale objects (only when pruning), indexed by value so a renamed object becomes one update
+    stale = [] if not prune else [
+        obj for obj in existing if obj['name'] not in desired_names and not obj.get('isSystemDefined')
+    ]
+    stale_by_value = {}
+    for obj in stale:
+        stale_by_value.setdefault(_object_key(obj), []).append(obj)
+
+    plan = {'create': [], 'update': [], 'delete': []}
+    renamed_ids = set()
+    for obj in desired:
+        current = existing_by_name.get(obj['name'])
+        if current is None:
+            candidates = stale_by_value.get(_object_key(obj))
+            if candidates:
+                current = candidates.pop()
+                renamed_ids.add(current['id'])
+                plan['update'].append((current, obj))
+            else:
+                plan['create'].append(obj)
+        elif not current.get('isSystemDefined') and _needs_update(current, obj):
+            plan['update'].append((current, obj))
+
+    plan['delete'] = [obj for obj in stale if obj['id'] not in renamed_ids]
+    return plan
+
+
+def plan_is_empty(plan: dict) -> bool:
+    """
+    Check if a plan has no changes
+    :param plan: Plan from plan_network_objects
+    :return: True if there is nothing to apply
+    """
+    return not (plan['create'] or plan['update'] or plan['delete'])
+
+
+def print_plan(plan: dict, limit: int = 50):
+    """
+    Print a plan summary and the first changes
+    :param plan: Plan from plan_network_objects
+    :param limit: Maximum number of changes to list
+    """
+    rows = [("[green]+ create[/]", obj['name'], "", obj['value']) for obj in plan['create']]
+    rows += [("[yellow]~ update[/]", f"{current['name']} -> {obj['name']}" if current['name'] != obj['name']
+              else obj['name'], current.get('value'), obj['value']) for current, obj in plan['update']]
+    rows += [("[red]- delete[/]", obj['name'], obj.get('value'), "") for obj in plan['delete']]
+
+    table = Table(title=f"Plan: {len(plan['create'])} to create, {len(plan['update'])} to update, "
+                        f"{len(plan['delete'])} to delete")
+    for col in ["Action", "Name", "Current Value", "Desired Value"]:
+        table.add_column(col)
+    for row in rows[:limit]:
+        table.add_row(*row)
+    if len(rows) > limit:
+        table.add_row("...", f"{len(rows) - limit} more", "", "")
+
+    console.print(table)
+
+
+def apply_plan(fdm: "FDM", plan: dict, workers: int = WORKERS, bulk: Optional[bool] = None) -> dict:
+    """
+    Apply a plan: create (bulk or concurrent), then update and delete concurrently
+    :param fdm: FDM client
+    :param plan: Plan from plan_network_objects
+    :param workers: Maximum number of concurrent requests
+    :param bulk: Use bulk requests for creates (None detects support from the device version)
+    :return: Report dict (created, updated, deleted, failed, retries, bulk_requests, elapsed)
+    """
+    start = time.monotonic()
+    report = {'created': [], 'updated': [], 'deleted': [], 'failed': [], 'retries': 0, 'bulk_requests': 0}
+
+    if plan['create']:
+        created = fdm.create_objects("object/networks", plan['create'], workers=workers, bulk=bulk)
+        for key in ('created', 'failed', 'retries', 'bulk_requests'):
+            report[key] += created[key]
+
+    # PUT needs the full existing object (id, version) with the desired fields applied
+    calls = []
+    for current, obj in plan['update']:
+        body = {key: value for key, value in current.items() if key != 'links'}
+        body.update({key: obj[key] for key in ('name', 'description', 'subType', 'value')})
+        calls.append(("PUT", f"object/networks/{current['id']}", body))
+    deletes = {f"object/networks/{obj['id']}": obj for obj in plan['delete']}
+    calls += [("DELETE", endpoint, None) for endpoint in deletes]
+
+    sent = fdm.send_concurrent(calls, workers=workers)
+    for (method, endpoint, body), data in sent['succeeded']:
+        if method == "PUT":
+            report['updated'].append(data)
+        else:
+            report['deleted'].append(deletes[endpoint])
+    for (method, endpoint, body), error in sent['failed']:
+        report['failed'].append((body or deletes[endpoint], error))
+    report['retries'] += sent['retries']
+
+    report['elapsed'] = time.monotonic() - start
+    return report
+
+
+def sync_device(fdm: "FDM", desired: list, prune: bool = False, workers: int = WORKERS, bulk: Optional[bool] = None,
+                plan_only: bool = False, verbose: bool = True, redundancy_report: Optional[str] = None) -> dict:
+    """
+    Run the plan/apply workflow on one device and start a deployment if anything changed
+    :param fdm: FDM client
+    :param desired: Desired network objects (from the CSV)
+    :param prune: Delete user-defined objects that are not in the CSV
+    :param workers: Maximum number of concurrent requests
+    :param bulk: Use bulk requests for creates (None detects support from the device version)
+    :param plan_only: Only build the plan
+    :param verbose: Print the plan and apply report
+    :param redundancy_report: CSV report path for objects that overlap or duplicate others (None to skip)
+    :return: Result dict (host, hostname, plan, report, redundant, deploy_id, state, error, started; elapsed once
+             finished)
+    """
+    result = {'host': fdm.host, 'hostname': None, 'plan': None, 'report': None, 'redundant': None, 'deploy_id': None,
+              'state': 'NO_CHANGES', 'error': None, 'started': time.monotonic()}
+
+    if not fdm.ensure_token():
+        result.update(state='FAILED', error="Failed to acquire token")
+        return result
+
+    items = fdm.get("devicesettings/default/devicehostnames")
+    result['hostname'] = items[0].get('hostname', 'unknown') if items else 'unknown'
+    if verbose:
+        console.print(f"[green]SUCCESS[/green]: Device Hostname: {result['hostname']}")
+
+    # Get All existing network objects
+    existing = fdm.get_all("object/networks")
+    if existing is None:
+        result.update(state='FAILED', error="Failed to fetch network objects")
+        return result
+
+    # Validate against what is on the device: overlapping / duplicate address ranges
+    if redundancy_report:
+        redundancies = find_redundancies(desired, existing)
+        write_redundancy_report(redundancies, redundancy_report)
+        result['redundant'] = len({id(obj) for obj, _, _, _ in redundancies})
+        if verbose and redundancies:
+            console.print(f"[yellow]WARNING[/yellow]: {result['redundant']} objects overlap or duplicate other objects "
+                          f"(see '{redundancy_report}')")
+
+    # Diff desired vs existing objects into a minimal plan
+    plan = plan_network_objects(desired, existing, prune=prune)
+    result['plan'] = plan
+    if verbose:
+        console.print(f"[green]SUCCESS[/green]: Retrieved {len(existing)} existing network objects")
+        print_plan(plan)
+
+    if plan_only:
+        result['state'] = 'PLANNED'
+        return result
+
+    if plan_is_empty(plan):
+        return result
+
+    # Apply the plan (creates in bulk where supported, otherwise concurrently)
+    report = apply_plan(fdm, plan, workers=workers, bulk=bulk)
+    result['report'] = report
+    if verbose:
+        print_apply_report(report)
 
-                if _is_valid_ip(value):
-                    obj['value'] = value
+    if not (report['created'] or report['updated'] or report['deleted']):
+        result.update(state='APPLY_FAILED', error="No changes were applied, skipping deployment")
+        return result
+
+    # Deploy configuration changes to FDM (monitored by monitor_deployments)
+    response = fdm.post("operational/deploy", {})
+    if not response:
+        result.update(state='DEPLOY_FAILED', error="Failed to start deployment")
+        return result
+
+    console.print(f"[green]SUCCESS[/green]: {fdm.host} deployment initiated with ID: {response['id']}")
+    result.update(deploy_id=response['id'], state=response['state'])
+    return result
+
+
+def monitor_deployments(deployments: list, timeout: float = DEPLOY_DEADLINE, workers: int = WORKERS):
+    """
+    Monitor many deployments in one scheduler: each is polled with adaptive backoff until it finishes or the
+    overall deadline passes (results are updated in place)
+    :param deployments: List of (FDM client, result dict from sync_device)
+    :param timeout: Overall deadline in seconds
+    :param workers: Maximum number of concurrent polls
+    """
+    now = time.monotonic()
+    deadline = now + timeout
+    pending = [
+        {'fdm': fdm, 'result': result, 'interval': DEPLOY_POLL_MIN, 'next_poll': now, 'failures': 0}
+        for fdm, result in deployments if result['deploy_id'] and result['state'] not in DEPLOY_FINAL_STATES
+    ]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                for entry in pending:
+                    entry['result'].update(state='MONITOR_TIMEOUT', error=f"Still {entry['result']['state']} at deadline",
+                                           elapsed=now - entry['result']['started'])
+                    console.print(f"[red]ERROR[/red]: {entry['fdm'].host} deployment did not finish before the deadline")
+                break
+
+            # Poll every deployment that is due, concurrently
+            due = [entry for entry in pending if entry['next_poll'] <= now]
+            polls = {
+                executor.submit(entry['fdm'].get, f"operational/deploy/{entry['result']['deploy_id']}"): entry
+                for entry in due
+            }
+
+            for future in as_completed(polls):
+                entry = polls[future]
+                result = entry['result']
+                response = future.result()
+
+                if response:
+                    entry['failures'] = 0
+                    result['state'] = response['state']
+                    console.print(f"[yellow]INFO[/yellow]: {entry['fdm'].host} - job id {result['deploy_id']} "
+                                  f"- {result['state']}")
                 else:
-                    console.print(f"[red]ERROR[/red]: Invalid IP address '{value}' for object '{row['Name']}'")
+                    entry['failures'] += 1
+                    if entry['failures'] >= MAX_RETRIES:
+                        result.update(state='MONITOR_FAILED', error="Failed to get deployment state")
+
+                if result['state'] in DEPLOY_FINAL_STATES or result['state'] == 'MONITOR_FAILED':
+                    pending.remove(entry)
+                    result['elapsed'] = time.monotonic() - result['started']
+                    if result['state'] == 'DEPLOYED':
+                        console.print(f"[green]SUCCESS[/green]: {entry['fdm'].host} configuration deployed successfully!")
+                    else:
+                        console.print(f"[red]ERROR[/red]: {entry['fdm'].host} deployment failed with state "
+                                      f"'{result['state']}'")
                     continue
 
-            elif subType == "NETWORK":
-                value = row["Value"].strip()
+                # Adaptive backoff: deployments take minutes, poll less often the longer they run
+                entry['interval'] = min(entry['interval'] * DEPLOY_POLL_BACKOFF, DEPLOY_POLL_MAX)
+                entry['next_poll'] = time.monotonic() + entry['interval']
 
-                if '/' not in value:
-                    console.print(f"[red]ERROR[/red]: Invalid value '{obj['value']}' for object '{row['Name']}'. Must be a network address!")
-                    continue
+            if pending:
+                next_poll = min(entry['next_poll'] for entry in pending)
+                time.sleep(max(0.0, min(next_poll, deadline) - time.monotonic()))
+
+
+def load_inventory(inventory_path: str) -> list:
+    """
+    Build FDM clients from a device inventory CSV (Host, Port, User, Password, Version), empty columns default to
+    the FDM_* env variables
+    :param inventory_path: Inventory CSV path
+    :return: List of FDM clients
+    """
+    devices = []
+    with open(inventory_path, 'r', newline='') as file:
+        for row in csv.DictReader(file):
+            devices.append(FDM(
+                row["Host"].strip(),
+                (row.get("Port") or "").strip() or fdm_port,
+                (row.get("User") or "").strip() or fdm_user,
+                (row.get("Password") or "").strip() or fdm_password,
+                (row.get("Version") or "").strip() or fdm_version,
+            ))
+    return devices
+
+
+def run_fleet(devices: list, desired: list, prune: bool = False, workers: int = WORKERS, bulk: Optional[bool] = None,
+              plan_only: bool = False, device_workers: int = DEVICE_WORKERS, timeout: float = DEPLOY_DEADLINE,
+              redundancy_report: Optional[str] = None) -> list:
+    """
+    Run the plan/apply/deploy workflow on many devices concurrently (each with its own session and token), then
+    monitor all deployments together
+    :param devices: List of FDM clients
+    :param desired: Desired network objects (from the CSV)
+    :param prune: Delete user-defined objects that are not in the CSV
+    :param workers: Maximum number of concurrent requests per device
+    :param bulk: Use bulk requests for creates (None detects support from the device version)
+    :param plan_only: Only build the plans
+    :param device_workers: Maximum number of devices processed at once
+    :param timeout: Overall deployment monitoring deadline in seconds
+    :param redundancy_report: CSV report path for overlapping objects (one file per host in fleet mode)
+    :return: List of result dicts (see sync_device)
+    """
+    verbose = len(devices) == 1
+    start = time.monotonic()
+
+    def report_path(fdm):
+        if not redundancy_report or verbose:
+            return redundancy_report
+        base, ext = os.path.splitext(redundancy_report)
+        return f"{base}_{fdm.host}{ext}"
+
+    deployments = []
+    with ThreadPoolExecutor(max_workers=device_workers) as executor:
+        futures = {
+            executor.submit(sync_device, fdm, desired, prune, workers, bulk, plan_only, verbose, report_path(fdm)): fdm
+            for fdm in devices
+        }
+        for future in as_completed(futures):
+            fdm = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # One broken device should not stop the fleet
+                result = {'host': fdm.host, 'hostname': None, 'plan': None, 'report': None, 'redundant': None,
+                          'deploy_id': None, 'state': 'FAILED', 'error': str(e), 'started': start}
+            if not result['deploy_id'] or result['state'] in DEPLOY_FINAL_STATES:
+                result['elapsed'] = time.monotonic() - result['started']
+            deployments.append((fdm, result))
+
+    monitor_deployments(deployments, timeout=timeout, workers=device_workers)
+
+    return [result for _, result in deployments]
+
+
+def print_fleet_summary(results: list):
+    """
+    Print a per-device summary of run_fleet
+    :param results: Result dicts from run_fleet
+    """
+    table = Table(title="FDM Fleet Summary")
+    for col in ["Host", "Hostname", "Create", "Update", "Delete", "Failed", "Overlaps", "State", "Elapsed (s)",
+                "Error"]:
+        table.add_column(col)
+
+    for result in sorted(results, key=lambda r: r['host']):
+        plan, report = result['plan'], result['report']
+        state = result['state']
+        style = "green" if state in ('DEPLOYED', 'NO_CHANGES', 'PLANNED') else "red"
+        table.add_row(
+            result['host'],
+            result['hostname'] or "N/A",
+            str(len(plan['create'])) if plan else "-",
+            str(len(plan['update'])) if plan else "-",
+            str(len(plan['delete'])) if plan else "-",
+            str(len(report['failed'])) if report else "-",
+            str(result['redundant']) if result['redundant'] is not None else "-",
+            f"[{style}]{state}[/]",
+            f"{result['elapsed']:.1f}",
+            result['error'] or "",
+        )
+
+    console.print(table)
+
+
+class FDM:
+    """
+    Class to interact with Cisco FDM API over a pooled keep-alive session (token refresh and on-disk token cache)
+    """
+
+    def __init__(self, host, port, username, password, version, pool_size=POOL_SIZE, token_cache=TOKEN_CACHE):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.base_url = f"https://{host}:{port}/api/fdm/{version}"
+        self.token_cache = token_cache
+        self.cache_key = f"{username}@{host}:{port}"
+
+        # One keep-alive session: TCP + TLS handshakes are reused across requests (and threads)
+        self.session = requests.Session()
+        self.session.verify = False  # Disable SSL verification (adjust as needed)
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers.update({'Content-Type': 'application/json', 'Accept': 'application/json'})
+
+        self.access_token = None
+        self.refresh_token = None
+        self.expires_at = 0.0
+        self.refresh_expires_at = 0.0
+        self.token_lock = threading.Lock()
+
+        self._load_cached_token()
+
+    def _load_cached_token(self):
+        """
+        Load a previously issued token for this host/user from the on-disk cache
+        """
+        if not self.token_cache or not os.path.exists(self.token_cache):
+            return
+
+        try:
+            with open(self.token_cache, 'r') as f:
+                cached = json.load(f).get(self.cache_key)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        if cached:
+            self._set_token(cached)
+
+    def _save_cached_token(self):
+        """
+        Save the current token to the on-disk cache (readable by the owner only)
+        """
+        if not self.token_cache:
+            return
+
+        with _token_cache_lock:
+            cache = {}
+            if os.path.exists(self.token_cache):
+                try:
+                    with open(self.token_cache, 'r') as f:
+                        cache = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    cache = {}
+
+            cache[self.cache_key] = {
+                'access_token': self.access_token,
+                'refresh_token': self.refresh_token,
+                'expires_at': self.expires_at,
+                'refresh_expires_at': self.refresh_expires_at,
+            }
+
+            fd = os.open(self.token_cache, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cache, f)
+
+    def _set_token(self, token_data):
+        """
+        Store token fields and the Authorization header
+        :param token_data: Token response (or cache entry)
+        """
+        now = time.time()
+        self.access_token = token_data.get('access_token')
+        self.refresh_token = token_data.get('refresh_token')
+        self.expires_at = token_data.get('expires_at') or now + token_data.get('expires_in', 0)
+        self.refresh_expires_at = token_data.get('refresh_expires_at') or now + token_data.get('refresh_expires_in', 0)
+        self.session.headers['Authorization'] = f'Bearer {self.access_token}'
+
+    def _grant(self, body):
+        """
+        Request a token from FDM
+        :param body: Grant body (password or refresh_token grant)
+        :return: True if a token was issued
+        """
+        response = self.session.post(f'{self.base_url}/fdm/token', json=body)
+        if response.status_code != 200:
+            console.print(f"[red]ERROR: Failed to get token: {response.status_code} - {response.text}[/red]")
+            return False
+
+        self._set_token(response.json())
+        self._save_cached_token()
+        return True
+
+    def login(self) -> bool:
+        """
+        Authenticate with a password grant
+        :return: True if authenticated
+        """
+        return self._grant({'grant_type': 'password', 'username': self.username, 'password': self.password})
+
+    def refresh(self) -> bool:
+        """
+        Renew the access token with the refresh token, fall back to a password grant if it has expired
+        :return: True if authenticated
+        """
+        if self.refresh_token and time.time() < self.refresh_expires_at - TOKEN_REFRESH_MARGIN:
+            if self._grant({'grant_type': 'refresh_token', 'refresh_token': self.refresh_token}):
+                return True
+        return self.login()
+
+    def ensure_token(self) -> bool:
+        """
+        Make sure a valid access token is available, refreshing it shortly before it expires
+        :return: True if authenticated
+        """
+        if self.access_token and time.time() < self.expires_at - TOKEN_REFRESH_MARGIN:
+            return True
+
+        with self.token_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self.access_token and time.time() < self.expires_at - TOKEN_REFRESH_MARGIN:
+                return True
+            return self.refresh()
+
+    def _send(self, method: str, endpoint: str, body: Optional[Union[dict, list]] = None,
+              params: Optional[dict] = None, auto_retry: bool = True) -> requests.Response:
+        """
+        Internal helper to send an HTTP request with a valid token (raises RequestException on connection errors)
+        :param method: "GET", "POST", "PUT", "DELETE"
+        :param endpoint: API endpoint (e.g., "object/networks") or a full URL (paging links)
+        :param body: JSON body for POST/PUT requests
+        :param params: URL parameters
+        :param auto_retry: Refresh the token and retry once on 401 Unauthorized
+        :return: HTTP response
+        """
+        self.ensure_token()
+        # Remember which token this request used (see the 401 handling below)
+        token = self.access_token
 
-                if _is_valid_network(value):
-                    obj['value'] = value
+        url = endpoint if endpoint.startswith('https://') else f"{self.base_url}/{endpoint}"
+        response = self.session.request(method, url, json=body, params=params)
+
+        if response.status_code == 401 and auto_retry:
+            # Token expired or revoked, get a new one, retry call
+            with self.token_lock:
+                # Concurrent workers that got a 401 for the same token only refresh once (each password grant
+                # opens a new FDM session, and FDM limits sessions per user)
+                if self.access_token == token:
+                    console.print("[yellow]Token expired, acquiring a new token...[/yellow]")
+                    self.refresh()
+            return self._send(method, endpoint, body, params, auto_retry=False)
+
+        return response
+
+    def _request(self, method: str, endpoint: str, body: Optional[Union[dict, list]] = None,
+                 params: Optional[dict] = None) -> Optional[Union[dict, list]]:
+        """
+        Internal helper to send HTTP requests, check HTTP status and parse JSON
+        :param method: "GET", "POST", "PUT", "DELETE"
+        :param endpoint: API endpoint (e.g., "object/networks") or a full URL (paging links)
+        :param body: JSON body for POST/PUT requests
+        :param params: URL parameters
+        :return: JSON response data ({} for empty responses), None on failure
+        """
+        try:
+            response = self._send(method, endpoint, body, params)
+        except requests.exceptions.RequestException as e:
+            console.print(f"[red]ERROR: Request failed: {e}[/red]")
+            return None
+
+        if response.status_code >= 400:
+            console.print(f"[red]ERROR: API call failed: {response.status_code} - {response.text}[/red]")
+            return None
+
+        if response.status_code == 204 or not response.content:
+            return {}
+
+        return response.json()
+
+    def get(self, endpoint: str, params: Optional[dict] = None) -> Optional[Union[list, dict]]:
+        """
+        Get data from FDM API, following paging links for collections
+        :param endpoint: API endpoint to call
+        :param params: URL parameters
+        :return: List of items for collections, JSON data otherwise, None on failure
+        """
+        all_items = []
+        url = endpoint
+
+        while url:
+            data = self._request("GET", url, params=params)
+            if data is None:
+                return None
+
+            if 'items' not in data:
+                return data
+
+            all_items.extend(data.get('items', []))
+
+            # Extract next URL from paging (already includes the query parameters)
+            next_links = data.get('paging', {}).get('next', [])
+            url = next_links[0] if next_links else None
+            params = None
+
+        return all_items
+
+    def iter_items(self, endpoint: str, params: Optional[dict] = None, limit: int = PAGE_LIMIT,
+                   workers: int = WORKERS) -> Iterator[dict]:
+        """
+        Stream the items of a collection: the first page gives the total count, the remaining offsets are fetched
+        concurrently and yielded as each page arrives (page order is not preserved)
+        :param endpoint: API endpoint to call (e.g., "object/networks")
+        :param params: URL parameters (e.g., {'filter': 'name:web'})
+        :param limit: Items per page
+        :param workers: Maximum number of concurrent page requests
+        :return: Generator of items (raises Exception if a page fails)
+        """
+        params = dict(params or {}, limit=limit, offset=0)
+        first = self._request("GET", endpoint, params=params)
+        if first is None:
+            raise Exception(f"Failed to fetch '{endpoint}'")
+
+        yield from first.get('items', [])
+
+        paging = first.get('paging', {})
+        if 'count' not in paging:
+            # No total count, fall back to following the next links one after another
+            next_links = paging.get('next', [])
+            if next_links:
+                remaining = self.get(next_links[0])
+                if remaining is None:
+                    raise Exception(f"Failed to fetch '{endpoint}'")
+                yield from remaining
+            return
+
+        # The device may cap the page size, use the limit it actually applied
+        page_limit = paging.get('limit') or limit
+        offsets = range(page_limit, paging['count'], page_limit)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._request, "GET", endpoint, None, dict(params, offset=offset, limit=page_limit)):
+                    offset for offset in offsets
+            }
+            try:
+                for future in as_completed(futures):
+                    page = future.result()
+                    if page is None:
+                        raise Exception(f"Failed to fetch '{endpoint}' at offset {futures[future]}")
+                    yield from page.get('items', [])
+            finally:
+                # Caller stopped early (or a page failed), do not fetch the rest
+                for future in futures:
+                    future.cancel()
+
+    def get_all(self, endpoint: str, params: Optional[dict] = None, limit: int = PAGE_LIMIT,
+                workers: int = WORKERS) -> Optional[list]:
+        """
+        Get every item of a large collection with concurrent page requests
+        :param endpoint: API endpoint to call (e.g., "object/networks")
+        :param params: URL parameters
+        :param limit: Items per page
+        :param workers: Maximum number of concurrent page requests
+        :return: List of items, None on failure
+        """
+        try:
+            return list(self.iter_items(endpoint, params, limit, workers))
+        except Exception as e:
+            console.print(f"[red]ERROR: {e}[/red]")
+            return None
+
+    def post(self, endpoint: str, body: Union[dict, list], params: Optional[dict] = None) -> Optional[Union[dict, list]]:
+        """
+        Post data to FDM API
+        :param endpoint: API endpoint to call
+        :param body: JSON body to send (a list for bulk requests)
+        :param params: URL parameters (e.g., {'bulk': 'true'})
+        :return: JSON response data, None on failure
+        """
+        return self._request("POST", endpoint, body=body, params=params)
+
+    def supports_bulk(self) -> bool:
+        """
+        Check if the device software supports bulk object operations (?bulk=true)
+        :return: True if supported
+        """
+        info = self._request("GET", "operational/systeminfo/default") or {}
+        version = info.get('softwareVersion', '')
+        try:
+            major_minor = tuple(int(part) for part in version.split('-')[0].split('.')[:2])
+        except ValueError:
+            return False
+        return major_minor >= BULK_MIN_VERSION
+
+    def _send_with_retry(self, method: str, endpoint: str, body: Optional[dict],
+                         retries: int) -> Tuple[Optional[dict], Optional[str], int]:
+        """
+        Send one request, retrying transient failures (connection errors, 429, 5xx) with backoff
+        :param method: "POST", "PUT", "DELETE"
+        :param endpoint: API endpoint to call
+        :param body: JSON body (None for DELETE)
+        :param retries: Maximum number of retries
+        :return: (response data or None, error or None, retries used)
+        """
+        error = None
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+
+            try:
+                response = self._send(method, endpoint, body)
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+                continue
+
+            if response.status_code < 400:
+                return (response.json() if response.content else {}), None, attempt
+
+            error = f"{response.status_code} - {response.text}"
+            if response.status_code != 429 and response.status_code < 500:
+                # Validation errors will not succeed on retry
+                return None, error, attempt
+
+        return None, error, retries
+
+    def send_concurrent(self, calls: list, workers: int = WORKERS, retries: int = MAX_RETRIES) -> dict:
+        """
+        Send many requests with a bounded worker pool, aggregating errors per request
+        :param calls: List of (method, endpoint, body)
+        :param workers: Maximum number of concurrent requests
+        :param retries: Maximum retries per request for transient failures
+        :return: Report dict (succeeded: [(call, data)], failed: [(call, error)], retries)
+        """
+        report = {'succeeded': [], 'failed': [], 'retries': 0}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._send_with_retry, *call, retries): call for call in calls}
+            for future in as_completed(futures):
+                data, error, retries_used = future.result()
+                report['retries'] += retries_used
+                if data is not None:
+                    report['succeeded'].append((futures[future], data))
                 else:
-                    console.print(f"[red]ERROR[/red]: Invalid network address '{value}' for object '{row['Name']}'")
-                    continue
+                    report['failed'].append((futures[future], error))
 
-            elif subType == "FQDN":
-                value = row["Value"].strip()
-                obj['value'] = value
-            else:
-                # RANGE Case
-                value = row["Value"].strip()
+        return report
+
+    def create_objects(self, endpoint: str, objects: list, workers: int = WORKERS, bulk: Optional[bool] = None,
+                       chunk_size: int = BULK_CHUNK_SIZE, retries: int = MAX_RETRIES) -> dict:
+        """
+        Create many objects, with bulk requests where supported, otherwise concurrently with a bounded worker pool
+        :param endpoint: API endpoint to call (e.g., "object/networks")
+        :param objects: List of objects to create
+        :param workers: Maximum number of concurrent requests
+        :param bulk: Use bulk requests (None detects support from the device version)
+        :param chunk_size: Objects per bulk request
+        :param retries: Maximum retries per object for transient failures
+        :return: Report dict (created, failed, retries, bulk_requests, elapsed)
+        """
+        start = time.monotonic()
+        report = {'created': [], 'failed': [], 'retries': 0, 'bulk_requests': 0, 'elapsed': 0.0}
 
-                if '-' not in value:
-                    console.print(f"[red]ERROR[/red]: Invalid value '{obj['value']}' for object '{row['Name']}'. Must be a range!")
+        if bulk is None:
+            bulk = self.supports_bulk()
+
+        # Bulk requests: one round trip per chunk, a failed chunk falls back to per-object creation
+        remaining = []
+        unconfirmed = []
+        if bulk:
+            for i in range(0, len(objects), chunk_size):
+                chunk = objects[i:i + chunk_size]
+                try:
+                    response = self._send("POST", endpoint, chunk, params={'bulk': 'true'})
+                except requests.exceptions.RequestException:
+                    # e.g., a read timeout: FDM may have committed the chunk anyway
+                    unconfirmed.extend(chunk)
                     continue
 
-                start, end = value.split('-')
-                start = start.strip()
-                end = end.strip()
+                if response.status_code < 400:
+                    report['bulk_requests'] += 1
+                    created = response.json()
+                    report['created'].extend(created.get('items', []) if isinstance(created, dict) else created)
+                else:
+                    remaining.extend(chunk)
+        else:
+            remaining = objects
 
-                if _is_valid_ip(start) and _is_valid_ip(end):
-                    obj['value'] = f"{start}-{end}"
+        # Objects of chunks without a response that exist now were created, retrying them would fail as duplicates
+        if unconfirmed:
+            existing = {item['name']: item for item in self.get_all(endpoint) or []}
+            for obj in unconfirmed:
+                if obj['name'] in existing:
+                    report['created'].append(existing[obj['name']])
                 else:
-                    console.print(f"[red]ERROR[/red]: Invalid range '{value}' for object '{row['Name']}'")
-                    continue
+                    remaining.append(obj)
 
-            network_objects.append(obj)
+        # Per-object creation with a bounded worker pool, errors aggregated per object
+        sent = self.send_concurrent([("POST", endpoint, obj) for obj in remaining], workers, retries)
+        report['created'].extend(data for _, data in sent['succeeded'])
+        report['failed'].extend((call[2], error) for call, error in sent['failed'])
+        report['retries'] += sent['retries']
 
-    # Add network objects to FDM
-    for obj in network_objects:
-        response = fdm_post(token, "object/networks", obj)
+        report['elapsed'] = time.monotonic() - start
+        return report
 
-        if response:
-            console.print(f"[green]SUCCESS[/green]: Created network object '{obj}'")
+    def put(self, endpoint: str, body: dict) -> Optional[dict]:
+        """
+        Update an object with FDM API (body must include the current 'version')
+        :param endpoint: API endpoint to call (e.g., "object/networks/{objId}")
+        :param body: JSON body to send
+        :return: JSON response data, None on failure
+        """
+        return self._request("PUT", endpoint, body=body)
 
-    # Deploy configuration changes to FDM
-    response = fdm_post(token, "operational/deploy", {})
+    def delete(self, endpoint: str) -> bool:
+        """
+        Delete an object with FDM API
+        :param endpoint: API endpoint to call (e.g., "object/networks/{objId}")
+        :return: True if deleted
+        """
+        return self._request("DELETE", endpoint) is not None
 
-    if response:
-        console.print(f"[green]SUCCESS[/green]: Deployment initiated with ID: {response['id']}")
 
-        # Check if deployment was successful
-        state = response['state']
-        obj_id = response['id']
-        while True:
-            # Break on success
-            if state == 'DEPLOYED':
-                console.print("[green]SUCCESS[/green]: Configuration deployed successfully!")
-                break
-            elif state in ['DEPLOY_FAILED', 'DEPLOY_TIMEOUT']:
-                console.print(f"[red]ERROR[/red]: Deployment failed with state '{state}'")
-                break
+def print_apply_report(report: dict):
+    """
+    Print throughput, failures and retries of apply_plan
+    :param report: Report returned by apply_plan
+    """
+    changed = len(report['created']) + len(report['updated']) + len(report['deleted'])
+    elapsed = report['elapsed']
 
-            # Get current state of deployment object
-            response = fdm_get(token, f"operational/deploy/{obj_id}")
-            if response:
-                console.print(f"[yellow]INFO[/yellow]: Current State of job id {obj_id} - {state}")
-                state = response['state']
-            else:
-                # Some failure, break infinite loop
-                break
+    table = Table(title="Network Object Changes")
+    for col in ["Created", "Updated", "Deleted", "Failed", "Retries", "Bulk Requests", "Elapsed (s)", "Objects/s"]:
+        table.add_column(col, justify="right")
+    table.add_row(str(len(report['created'])), str(len(report['updated'])), str(len(report['deleted'])),
+                  str(len(report['failed'])), str(report['retries']), str(report['bulk_requests']),
+                  f"{elapsed:.1f}", f"{changed / elapsed if elapsed else 0:.1f}")
+    console.print(table)
+
+    for obj, error in report['failed']:
+        console.print(f"[red]ERROR[/red]: Failed to change '{obj.get('name')}': {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync FDM network objects to a CSV (desired state) and deploy")
+    parser.add_argument('--csv', default="network_objects.csv", help="CSV of network objects (desired state)")
+    parser.add_argument('--report', default=REJECTED_REPORT, help="CSV report of rejected rows")
+    parser.add_argument('--redundancy-report', default=REDUNDANCY_REPORT,
+                        help="CSV report of objects that overlap or duplicate others")
+    parser.add_argument('--processes', type=int, default=None, help="Worker processes for large CSV validation")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="Concurrent object change requests")
+    parser.add_argument('--no-bulk', action='store_true', help="Never use bulk requests, even if supported")
+    parser.add_argument('--prune', action='store_true', help="Delete user-defined objects that are not in the CSV")
+    parser.add_argument('--plan', action='store_true', help="Only print the plan, do not apply or deploy")
+    parser.add_argument('--inventory', help="Device inventory CSV (Host, Port, User, Password, Version) for fleet mode")
+    parser.add_argument('--devices', type=int, default=DEVICE_WORKERS, help="Devices processed concurrently")
+    parser.add_argument('--deadline', type=float, default=DEPLOY_DEADLINE, help="Deployment monitoring deadline (s)")
+    args = parser.parse_args()
+
+    # Read csv, validate and create payloads for objects in FDM format (rejected rows go to the report file)
+    desired_objects = load_network_objects(args.csv, args.report, workers=args.processes)
+
+    # One device from the FDM_* env variables, or a fleet from an inventory file
+    if args.inventory:
+        devices = load_inventory(args.inventory)
+    else:
+        devices = [FDM(fdm_host, fdm_port, fdm_user, fdm_password, fdm_version)]
+
+    bulk = False if args.no_bulk else None
+    results = run_fleet(devices, desired_objects, prune=args.prune, workers=args.workers, bulk=bulk,
+                        plan_only=args.plan, device_workers=args.devices, timeout=args.deadline,
+                        redundancy_report=args.redundancy_report)
+    print_fleet_summary(results)
 
-            # sleep for a while before checking again
-            time.sleep(2)
+    ok_states = ('DEPLOYED', 'NO_CHANGES', 'PLANNED')
+    exit(0 if all(result['state'] in ok_states for result in results) else 1)
@@ -0,0 +1,284 @@
+"""
+Benchmarks for intersight_sdk.py
+
+Usage:
+    python benchmarks.py import-time [--max-seconds 1.0] [--runs 3]
+    python benchmarks.py deserialize [--objects 200] [--no-memory]
+    python benchmarks.py signing [--requests 500] [--threads 8]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Imports the lab module in a fresh interpreter and reports how long it took and which intersight modules it loaded
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import intersight_sdk
+elapsed = time.perf_counter() - start
+sdk_modules = [m for m in sys.modules if m == "intersight" or m.startswith("intersight.")]
+print(json.dumps({"elapsed": elapsed, "sdk_modules": len(sdk_modules)}))
+"""
+
+# What the module used to import at load time, for comparison
+EAGER_PROBE = """
+import json, time
+start = time.perf_counter()
+from intersight import ApiClient, Configuration, signing, ApiException
+from intersight.api import compute_api, ntp_api, firmware_api
+from intersight.model.mo_mo_ref import MoMoRef
+from intersight.api.organization_api import OrganizationApi
+from intersight.model.ntp_policy import NtpPolicy
+print(json.dumps({"elapsed": time.perf_counter() - start, "sdk_modules": -1}))
+"""
+
+
+def _run_probe(probe: str) -> dict:
+    """
+    Run a probe script in a fresh interpreter (so nothing is already cached in sys.modules)
+    :param probe: Python source to run
+    :return: JSON result printed by the probe
+    """
+    result = subprocess.run([sys.executable, "-c", probe], cwd=script_dir, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _rack_unit(i: int) -> dict:
+    """
+    Build a synthetic compute.RackUnit as returned by the API (scalar properties only)
+    :param i: Index, used to make values unique
+    :return: RackUnit JSON dict
+    """
+    return {
+        "ClassId": "compute.RackUnit", "ObjectType": "compute.RackUnit", "Moid": f"{i:024x}",
+        "Name": f"rack-{i}", "Serial": f"WZP{i:08d}", "Model": "UCSC-C220-M5SX", "Vendor": "Cisco Systems Inc",
+        "Dn": f"sys/rack-unit-{i}", "Rn": f"rack-unit-{i}", "AccountMoid": "5b2541b7", "DomainGroupMoid": "5b2541b8",
+        "SharedScope": "", "DeviceMoId": f"{i:024x}", "Presence": "equipped", "Revision": "0",
+        "AdminPowerState": "policy", "AssetTag": "Unknown", "HardwareUuid": f"{i:08d}-0000-0000-0000-000000000000",
+        "ManagementMode": "IntersightStandalone", "MgmtIpAddress": f"10.0.{i // 256 % 256}.{i % 256}",
+        "OperPowerState": "on", "OperState": "ok", "Operability": "operable", "PlatformType": "IMCM5",
+        "UserLabel": "", "Uuid": f"{i:08d}-0000-0000-0000-000000000001",
+    }
+
+
+class _FakeResponse:
+    """
+    Minimal urllib3 response stand-in for ApiClient.deserialize
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def getheader(self, name, default=None):
+        return "application/json" if name.lower() == "content-type" else default
+
+    def getheaders(self):
+        return {"Content-Type": "application/json"}
+
+
+def _measure(func, memory=True):
+    """
+    Run func twice: once for wall time, once under tracemalloc for peak memory (tracing skews timings)
+    :param func: Callable to measure
+    :param memory: Also measure peak memory (slow for the SDK model path)
+    :return: Tuple of (seconds, peak bytes or None)
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    if not memory:
+        return elapsed, None
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def benchmark_deserialize(objects: int, fields: list, memory: bool) -> bool:
+    """
+    Compare SDK model deserialization (the default `results` path) with the raw JSON + Record fast path
+    :param objects: Number of RackUnit objects in the synthetic page
+    :param fields: Fields the fast path keeps
+    :param memory: Also measure peak memory
+    :return: True (informational benchmark)
+    """
+    from intersight import ApiClient, Configuration
+    from intersight.model.compute_rack_unit_response import ComputeRackUnitResponse
+    from intersight_sdk import record_type
+
+    # The model path gets the full objects, the fast path $selects only the fields it needs
+    full = json.dumps({"ObjectType": "compute.RackUnit.List", "Results": [_rack_unit(i) for i in range(objects)]})
+    selected = json.dumps({"ObjectType": "compute.RackUnit.List",
+                           "Results": [{f: _rack_unit(i)[f] for f in fields} for i in range(objects)]})
+    api_client = ApiClient(Configuration())
+    cls = record_type(fields)
+
+    # Warm up: the SDK imports nested model modules on first deserialize, keep that out of the measurement
+    warm_up = json.dumps({"ObjectType": "compute.RackUnit.List", "Results": [_rack_unit(0)]})
+    api_client.deserialize(_FakeResponse(warm_up.encode()), (ComputeRackUnitResponse,), True)
+
+    def model_path():
+        response = api_client.deserialize(_FakeResponse(full.encode()), (ComputeRackUnitResponse,), True)
+        return response.results
+
+    def raw_path():
+        return [cls([item.get(f) for f in fields]) for item in json.loads(selected)["Results"]]
+
+    table = Table(title=f"Deserializing {objects} compute.RackUnit objects")
+    table.add_column("Path", style="cyan")
+    table.add_column("Payload (KB)", justify="right")
+    table.add_column("Time (s)", justify="right", style="magenta")
+    table.add_column("Peak Memory (MB)", justify="right", style="green")
+
+    for name, payload, func in (("SDK models (results)", full, model_path), ("Raw JSON + Record", selected, raw_path)):
+        elapsed, peak = _measure(func, memory)
+        peak_mb = f"{peak / 1024 / 1024:.1f}" if peak is not None else "-"
+        table.add_row(name, f"{len(payload) / 1024:.0f}", f"{elapsed:.3f}", peak_mb)
+    console.print(table)
+    return True
+
+
+def _signing_throughput(signing_info, requests: int, threads: int) -> float:
+    """
+    Sign a typical list request repeatedly
+    :param signing_info: HttpSigningConfiguration
+    :param requests: Number of signatures
+    :param threads: Concurrent signing threads
+    :return: Signatures per second
+    """
+    def sign(_):
+        signing_info.get_http_signature_headers("/api/v1/compute/RackUnits", "GET", {}, None,
+                                                [("$top", 1000), ("$skip", 0)])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(sign, range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def benchmark_signing(requests: int, threads: int) -> bool:
+    """
+    Compare RSA and EC request signing throughput, and key parsing per client vs the shared parsed key
+    :param requests: Signatures per measurement
+    :param threads: Concurrent signing threads for the threaded measurement
+    :return: True (informational benchmark)
+    """
+    from Crypto.PublicKey import ECC, RSA
+    from intersight import signing  # noqa: F401 (keep the SDK import out of the key parse timing)
+    import intersight_sdk
+
+    keys = {
+        "RSA 2048": RSA.generate(2048).export_key().decode(),
+        "EC P-256": ECC.generate(curve="P-256").export_key(format="PEM", use_pkcs8=False),
+    }
+
+    table = Table(title=f"HTTP Signature Throughput ({requests} requests)")
+    table.add_column("Key", style="cyan")
+    table.add_column("Parse Key (ms)", justify="right")
+    table.add_column("Shared Key (ms)", justify="right", style="green")
+    table.add_column("Signatures/s (1 thread)", justify="right", style="magenta")
+    table.add_column(f"Signatures/s ({threads} threads)", justify="right", style="magenta")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, pem in keys.items():
+            path = os.path.join(tmp, name.replace(" ", "_") + ".pem")
+            with open(path, "w") as f:
+                f.write(pem)
+
+            # First call reads and parses the PEM, later clients get a copy sharing the parsed key
+            start = time.perf_counter()
+            signing_info = intersight_sdk._signing_config(name, path)
+            parse = time.perf_counter() - start
+            start = time.perf_counter()
+            intersight_sdk._signing_config(name, path)
+            shared = time.perf_counter() - start
+
+            signing_info.host = "intersight.com"
+            table.add_row(name, f"{parse * 1000:.2f}", f"{shared * 1000:.3f}",
+                          f"{_signing_throughput(signing_info, requests, 1):.0f}",
+                          f"{_signing_throughput(signing_info, requests, threads):.0f}")
+    console.print(table)
+    return True
+
+
+def benchmark_import_time(max_seconds: float, runs: int, compare_eager: bool) -> bool:
+    """
+    Time importing intersight_sdk and check it doesn't pull in the SDK at import time
+    :param max_seconds: Fail if the best import time is above this
+    :param runs: Number of fresh-interpreter runs (best time is reported)
+    :param compare_eager: Also time the full SDK imports the module used to do at load time
+    :return: True if the benchmark passed
+    """
+    lazy = [_run_probe(IMPORT_PROBE) for _ in range(runs)]
+    best = min(r["elapsed"] for r in lazy)
+    sdk_modules = max(r["sdk_modules"] for r in lazy)
+
+    table = Table(title="intersight_sdk Import Time")
+    table.add_column("Import", style="cyan")
+    table.add_column("Best (s)", justify="right", style="magenta")
+    table.add_column("SDK Modules Loaded", justify="right", style="green")
+    table.add_row("intersight_sdk (lazy)", f"{best:.3f}", str(sdk_modules))
+
+    if compare_eager:
+        try:
+            eager = min(_run_probe(EAGER_PROBE)["elapsed"] for _ in range(runs))
+            table.add_row("SDK imports (eager)", f"{eager:.3f}", "-")
+        except subprocess.CalledProcessError:
+            console.print("[yellow]intersight package not installed, skipping eager comparison[/yellow]")
+    console.print(table)
+
+    passed = True
+    if best > max_seconds:
+        console.print(f"[bold red]FAIL:[/bold red] import took {best:.3f}s (limit {max_seconds:.3f}s)")
+        passed = False
+    if sdk_modules:
+        console.print(f"[bold red]FAIL:[/bold red] {sdk_modules} intersight modules imported at module load")
+        passed = False
+    if passed:
+        console.print("[bold green]PASS[/bold green]")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Intersight lab benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    import_parser = subparsers.add_parser("import-time", help="Guard against slow module import")
+    import_parser.add_argument("--max-seconds", type=float, default=1.0, help="Maximum allowed import time")
+    import_parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter runs")
+    import_parser.add_argument("--no-compare", action="store_true", help="Skip timing the eager SDK imports")
+
+    deserialize_parser = subparsers.add_parser("deserialize", help="SDK models vs raw JSON fast path")
+    deserialize_parser.add_argument("--objects", type=int, default=200, help="Objects in the synthetic page")
+    deserialize_parser.add_argument("--fields", nargs="+", default=["Name", "Serial", "Model", "Moid"],
+                                    help="Fields selected by the fast path")
+    deserialize_parser.add_argument("--no-memory", action="store_true", help="Skip the (slow) peak memory runs")
+
+    signing_parser = subparsers.add_parser("signing", help="RSA vs EC request signing throughput")
+    signing_parser.add_argument("--requests", type=int, default=500, help="Signatures per measurement")
+    signing_parser.add_argument("--threads", type=int, default=8, help="Threads for the concurrent measurement")
+
+    args = parser.parse_args()
+
+    if args.benchmark == "import-time":
+        ok = benchmark_import_time(args.max_seconds, args.runs, not args.no_compare)
+    elif args.benchmark == "deserialize":
+        ok = benchmark_deserialize(args.objects, args.fields, not args.no_memory)
+    elif args.benchmark == "signing":
+        ok = benchmark_signing(args.requests, args.threads)
+    sys.exit(0 if ok else 1)
@@ -1,14 +1,22 @@
+import argparse
+import copy
+import gzip
+import importlib
+import json
 import os
-from intersight import ApiClient, Configuration, signing, ApiException
-from intersight.api import compute_api, ntp_api, firmware_api
-from intersight.model.mo_mo_ref import MoMoRef
-from intersight.api.organization_api import OrganizationApi
-from intersight.model.ntp_policy import NtpPolicy
+import re
+import sqlite3
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.table import Table
+from urllib3.exceptions import HTTPError
 
 # Rich console
 console = Console()
@@ -19,6 +27,48 @@ load_dotenv()
 INTERSIGHT_KEY_ID = os.getenv("INTERSIGHT_KEY_ID")
 INTERSIGHT_SECRET_FILE = os.getenv("INTERSIGHT_SECRET_FILE")
 
+# List paging ($top is capped at 1000 by Intersight)
+PAGE_SIZE = 1000
+PAGE_WORKERS = 4
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Delta inventory sync: SQLite snapshot path, object type -> (API module, API class, list method)
+INVENTORY_DB = os.path.join(script_dir, "intersight_inventory.db")
+SYNC_CLASSES = {
+    "compute.PhysicalSummary": ("api.compute_api", "ComputeApi", "get_compute_physical_summary_list"),
+    "compute.RackUnit": ("api.compute_api", "ComputeApi", "get_compute_rack_unit_list"),
+    "compute.Blade": ("api.compute_api", "ComputeApi", "get_compute_blade_list"),
+}
+# The watermark is the sync start time minus this margin (seconds), covering clock skew and in-flight writes
+SYNC_WATERMARK_MARGIN = 5 * 60
+
+# Multi-class inventory snapshot: object type -> (API module, API class, list method)
+SNAPSHOT_FILE = os.path.join(script_dir, "intersight_snapshot.json.gz")
+SNAPSHOT_CLASSES = {
+    "compute.PhysicalSummary": ("api.compute_api", "ComputeApi", "get_compute_physical_summary_list"),
+    "compute.RackUnit": ("api.compute_api", "ComputeApi", "get_compute_rack_unit_list"),
+    "ntp.Policy": ("api.ntp_api", "NtpApi", "get_ntp_policy_list"),
+    "firmware.RunningFirmware": ("api.firmware_api", "FirmwareApi", "get_firmware_running_firmware_list"),
+}
+
+# Bulk policy creation (Intersight accepts at most 100 sub-requests per bulk request)
+BULK_CHUNK_SIZE = 100
+POLICY_WORKERS = 8
+
+# Client connection pool, sized for the most concurrent caller (a snapshot pages every class at once)
+CLIENT_POOL_SIZE = max(PAGE_WORKERS * len(SNAPSHOT_CLASSES), POLICY_WORKERS)
+
+
+def _sdk_class(module_path: str, class_name: str):
+    """
+    Import an Intersight SDK class on first use (the SDK is very large, importing it all up front takes seconds)
+    :param module_path: Module under the intersight package (e.g., "api.compute_api")
+    :param class_name: Class name (e.g., "ComputeApi")
+    :return: SDK class
+    """
+    return getattr(importlib.import_module(f"intersight.{module_path}"), class_name)
+
 
 def _select_ntp_server_ips(ntp_servers: list) -> list:
     """
@@ -52,7 +102,7 @@ def _select_organization(intersight_client):
     :param intersight_client: Intersight API client
     :return: Selected organization object
     """
-    org_api = OrganizationApi(intersight_client)
+    org_api = _sdk_class("api.organization_api", "OrganizationApi")(intersight_client)
     orgs = org_api.get_organization_organization_list().results
 
     table = Table(title="Available Organizations")
@@ -70,61 +120,820 @@ def _select_organization(intersight_client):
     selected_org = orgs[selected_index]
 
     # Create MoMoRef object for the selected organization
-    return MoMoRef(
+    return _sdk_class("model.mo_mo_ref", "MoMoRef")(
         class_id="mo.MoRef",
         object_type="organization.Organization",
         moid=selected_org.moid
     )
 
 
-def get_intersight_client(api_key_id, private_key_path, endpoint="https://intersight.com"):
+# Parsed signing configurations, shared by every client that uses the same key
+_signing_configs = {}
+_signing_lock = threading.Lock()
+
+
+def _signing_config(api_key_id, private_key_path):
+    """
+    Get the HTTP signing configuration for an API key, reading and parsing the PEM only once per process
+    :param api_key_id: API key ID
+    :param private_key_path: Path to the private key file
+    :return: HttpSigningConfiguration (a shallow copy: the parsed key is shared, the host is set per client)
+    """
+    from intersight import signing
+
+    cache_key = (api_key_id, os.path.abspath(private_key_path))
+    with _signing_lock:
+        if cache_key not in _signing_configs:
+            # Load the private key
+            with open(private_key_path, 'r') as f:
+                private_key = f.read()
+
+            if "BEGIN RSA PRIVATE KEY" in private_key:
+                signing_algorithm = signing.ALGORITHM_RSASSA_PKCS1v15
+            elif "BEGIN EC PRIVATE KEY" in private_key:
+                signing_algorithm = signing.ALGORITHM_ECDSA_MODE_DETERMINISTIC_RFC6979
+            else:
+                raise ValueError("Unsupported private key format.")
+
+            # Comes directly from SDK docs
+            _signing_configs[cache_key] = signing.HttpSigningConfiguration(
+                key_id=api_key_id,
+                private_key_string=private_key,
+                signing_scheme=signing.SCHEME_HS2019,
+                signing_algorithm=signing_algorithm,
+                hash_algorithm=signing.HASH_SHA256,
+                signed_headers=[
+                    signing.HEADER_REQUEST_TARGET,
+                    signing.HEADER_HOST,
+                    signing.HEADER_DATE,
+                    signing.HEADER_DIGEST
+                ]
+            )
+        return copy.copy(_signing_configs[cache_key])
+
+
+def get_intersight_client(api_key_id, private_key_path, endpoint="https://intersight.com", pool_size=CLIENT_POOL_SIZE):
     """
     Create an Intersight API client with the provided API key and private key.
     :param api_key_id: API key ID
     :param private_key_path: Path to the private key file
     :param endpoint: Base URL for Intersight API
+    :param pool_size: Maximum kept-alive connections (should cover every concurrent caller on this client)
     :return: Intersight API client
     """
-    # Load the private key
-    with open(private_key_path, 'r') as f:
-        private_key = f.read()
-
-    if "BEGIN RSA PRIVATE KEY" in private_key:
-        signing_algorithm = signing.ALGORITHM_RSASSA_PKCS1v15
-    elif "BEGIN EC PRIVATE KEY" in private_key:
-        signing_algorithm = signing.ALGORITHM_ECDSA_MODE_DETERMINISTIC_RFC6979
-    else:
-        raise ValueError("Unsupported private key format.")
-
-    # Comes directly from SDK docs
-    config = Configuration(
-        host=endpoint,
-        signing_info=signing.HttpSigningConfiguration(
-            key_id=api_key_id,
-            private_key_string=private_key,
-            signing_scheme=signing.SCHEME_HS2019,
-            signing_algorithm=signing_algorithm,
-            hash_algorithm=signing.HASH_SHA256,
-            signed_headers=[
-                signing.HEADER_REQUEST_TARGET,
-                signing.HEADER_HOST,
-                signing.HEADER_DATE,
-                signing.HEADER_DIGEST
-            ]
-        )
-    )
+    from intersight import ApiClient, Configuration
+
+    config = Configuration(host=endpoint, signing_info=_signing_config(api_key_id, private_key_path))
+    # The SDK default is cpu_count * 5, small hosts would open and drop connections under concurrency
+    config.connection_pool_maxsize = pool_size
     return ApiClient(config)
 
 
+class RequestTimer:
+    """
+    Per-request timing of an ApiClient split into signing, connection setup and server time (response wait and
+    transfer)
+    """
+
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def install(self, api_client):
+        """
+        Instrument an ApiClient: its signing configuration, REST client and connection pool classes
+        :param api_client: Intersight API client (not a LazyApiClient, use its .client)
+        """
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+        timer = self
+        local = self._local
+
+        sign = api_client.configuration.signing_info.get_http_signature_headers
+
+        def timed_sign(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return sign(*args, **kwargs)
+            finally:
+                local.signing = time.perf_counter() - start
+
+        api_client.configuration.signing_info.get_http_signature_headers = timed_sign
+
+        def timed_connection(connection_cls):
+            class TimedConnection(connection_cls):
+                def connect(conn):
+                    start = time.perf_counter()
+                    try:
+                        super().connect()
+                    finally:
+                        local.connect = getattr(local, "connect", 0.0) + time.perf_counter() - start
+            return TimedConnection
+
+        # New connections (TCP + TLS handshakes) are timed by the pool's connection class
+        pool_manager = api_client.rest_client.pool_manager
+        pool_manager.pool_classes_by_scheme = {
+            "http": type("TimedHTTPConnectionPool", (HTTPConnectionPool,),
+                         {"ConnectionCls": timed_connection(HTTPConnection)}),
+            "https": type("TimedHTTPSConnectionPool", (HTTPSConnectionPool,),
+                          {"ConnectionCls": timed_connection(HTTPSConnection)}),
+        }
+        pool_manager.clear()
+
+        request = api_client.rest_client.request
+
+        def timed_request(*args, **kwargs):
+            local.connect = 0.0
+            start = time.perf_counter()
+            try:
+                return request(*args, **kwargs)
+            finally:
+                total = time.perf_counter() - start
+                timer._record(getattr(local, "signing", 0.0), local.connect, total - local.connect)
+                local.signing = 0.0
+
+        api_client.rest_client.request = timed_request
+
+    def _record(self, signing, connect, server):
+        with self._lock:
+            self.samples.append((signing, connect, server))
+
+    def print_summary(self):
+        """
+        Print mean and p95 per phase, plus how many requests had to open a new connection
+        """
+        with self._lock:
+            samples = list(self.samples)
+        if not samples:
+            console.print("[yellow]No requests timed[/]")
+            return
+
+        table = Table(title=f"Request Timing ({len(samples)} requests)")
+        table.add_column("Phase", style="cyan")
+        table.add_column("Mean (ms)", justify="right", style="magenta")
+        table.add_column("p95 (ms)", justify="right", style="magenta")
+        table.add_column("Total (s)", justify="right")
+        for idx, phase in enumerate(("Signing", "Connection setup", "Server + transfer")):
+            values = sorted(sample[idx] for sample in samples)
+            p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+            table.add_row(phase, f"{sum(values) / len(values) * 1000:.1f}", f"{p95 * 1000:.1f}", f"{sum(values):.2f}")
+        console.print(table)
+
+        new_connections = sum(1 for _, connect, _ in samples if connect)
+        console.print(f"{new_connections} of {len(samples)} requests opened a new connection")
+
+
+class LazyApiClient:
+    """
+    Intersight ApiClient proxy: the SDK import, key loading and ApiClient construction happen on first use
+    """
+
+    def __init__(self, api_key_id, private_key_path, endpoint="https://intersight.com"):
+        self._args = (api_key_id, private_key_path, endpoint)
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """
+        Get the underlying ApiClient, constructing it on first use
+        :return: Intersight API client
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = get_intersight_client(*self._args)
+        return self._client
+
+    def __getattr__(self, name):
+        # Only called for attributes not defined on the proxy (call_api, configuration, ...)
+        return getattr(self.client, name)
+
+
+def count_objects(list_call, filter=None) -> int:
+    """
+    Get the number of objects a get_*_list call would return, using $count (no objects are transferred)
+    :param list_call: SDK list method (e.g., ComputeApi(client).get_compute_rack_unit_list)
+    :param filter: Optional $filter expression
+    :return: Object count
+    """
+    query = {"filter": filter} if filter else {}
+    return list_call(count=True, **query).count
+
+
+# One page of a raw (_preload_content=False) list response
+_RawPage = namedtuple("_RawPage", ["results", "count"])
+
+
+def _raw_list_call(list_call):
+    """
+    Wrap a get_*_list method so it returns parsed JSON instead of SDK model objects
+    :param list_call: SDK list method
+    :return: Callable returning a _RawPage of plain dicts
+    """
+    def call(**kwargs):
+        response = list_call(_preload_content=False, **kwargs)
+        body = json.loads(response.data)
+        return _RawPage(body.get("Results") or [], body.get("Count"))
+    return call
+
+
+def iter_list(list_call, page_size=PAGE_SIZE, workers=PAGE_WORKERS, raw=False, **query):
+    """
+    Stream every object from a get_*_list call, paging with $top/$skip.
+    The first page is requested with $inlinecount=allpages to learn the total, the remaining pages are fetched
+    concurrently (at most `workers` in flight) and yielded in order as they arrive.
+    :param list_call: SDK list method (e.g., ComputeApi(client).get_compute_rack_unit_list)
+    :param page_size: Objects per page ($top)
+    :param workers: Maximum concurrent page requests
+    :param raw: Skip SDK model deserialization and yield the JSON dicts as returned by the API
+    :param query: Extra list arguments ($filter, $select, ...)
+    :return: Generator of objects
+    """
+    if raw:
+        list_call = _raw_list_call(list_call)
+
+    # A stable sort order keeps $skip windows from overlapping or missing objects
+    query.setdefault("orderby", "Moid")
+
+    first = list_call(top=page_size, skip=0, inlinecount="allpages", **query)
+    yield from first.results
+    total = first.count or 0
+    skips = iter(range(page_size, total, page_size))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for skip in skips:
+            in_flight.append(executor.submit(list_call, top=page_size, skip=skip, **query))
+            if len(in_flight) >= workers:
+                break
+
+        while in_flight:
+            page = in_flight.popleft().result()
+            # Top up the window before handing results to the caller
+            skip = next(skips, None)
+            if skip is not None:
+                in_flight.append(executor.submit(list_call, top=page_size, skip=skip, **query))
+            yield from page.results
+
+
+class Record:
+    """
+    Lightweight record holding only the selected fields of an Intersight object (see record_type)
+    """
+    __slots__ = ()
+    # API property names, in the same order as __slots__
+    _fields = ()
+
+    def __init__(self, values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def to_dict(self) -> dict:
+        """
+        Convert to a dict keyed by attribute name
+        :return: Dict of attribute name -> value
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+_record_types = {}
+
+
+def _snake_case(name: str) -> str:
+    """
+    Convert an API property name to the SDK attribute name (e.g., "ServerIpAddress" -> "server_ip_address")
+    :param name: API property name
+    :return: snake_case name
+    """
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", name).lower()
+
+
+def record_type(fields) -> type:
+    """
+    Get (or create) a __slots__ Record class for a set of API properties.
+    Attributes use the SDK's snake_case names so records can stand in for model objects (r.serial, r.moid, ...)
+    :param fields: API property names (e.g., ["Name", "Serial", "Moid"])
+    :return: Record subclass
+    """
+    fields = tuple(fields)
+    if fields not in _record_types:
+        slots = tuple(_snake_case(f) for f in fields)
+        _record_types[fields] = type("Record", (Record,), {"__slots__": slots, "_fields": fields})
+    return _record_types[fields]
+
+
+def iter_records(list_call, fields, as_dicts=False, **query):
+    """
+    Fast path for bulk reads: $select only the given fields and skip SDK model deserialization
+    :param list_call: SDK list method (e.g., ComputeApi(client).get_compute_rack_unit_list)
+    :param fields: API property names to return (e.g., ["Name", "Serial", "Moid"])
+    :param as_dicts: Yield dicts keyed by snake_case name instead of Record objects
+    :param query: Extra list arguments ($filter, $orderby, page_size, workers, ...)
+    :return: Generator of Records (or dicts)
+    """
+    cls = record_type(fields)
+    for item in iter_list(list_call, raw=True, select=",".join(cls._fields), **query):
+        values = [item.get(f) for f in cls._fields]
+        yield dict(zip(cls.__slots__, values)) if as_dicts else cls(values)
+
+
+def _odata_literal(value) -> str:
+    """
+    Format a Python value as an OData literal for $filter expressions
+    :param value: str, bool, int, float or None
+    :return: OData literal
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class Query:
+    """
+    Builder for list query options ($select, $filter, $orderby, $apply) so filtering, projection and aggregation
+    happen on Intersight instead of downloading full objects
+    """
+
+    def __init__(self):
+        self._select = []
+        self._filters = []
+        self._orderby = []
+        self._apply = None
+
+    def select(self, *fields):
+        """
+        Only return these properties ($select)
+        :param fields: Property names (e.g., "Name", "Serial")
+        :return: self
+        """
+        self._select.extend(fields)
+        return self
+
+    def where(self, expression: str):
+        """
+        Add a raw $filter expression, ANDed with any others
+        :param expression: OData filter (e.g., "Model eq 'UCSC-C220-M5SX'")
+        :return: self
+        """
+        self._filters.append(expression)
+        return self
+
+    def eq(self, field: str, value):
+        """
+        Add a "field eq value" filter
+        :param field: Property name
+        :param value: Value to match
+        :return: self
+        """
+        return self.where(f"{field} eq {_odata_literal(value)}")
+
+    def in_(self, field: str, values):
+        """
+        Add a "field in (...)" filter
+        :param field: Property name
+        :param values: Values to match
+        :return: self
+        """
+        return self.where(f"{field} in ({', '.join(_odata_literal(v) for v in values)})")
+
+    def order_by(self, field: str, descending=False):
+        """
+        Sort results server-side ($orderby)
+        :param field: Property name
+        :param descending: Sort descending
+        :return: self
+        """
+        self._orderby.append(f"{field} desc" if descending else field)
+        return self
+
+    def group_by(self, *fields, count_as=None):
+        """
+        Aggregate server-side with $apply=groupby(...); results become plain dicts of the grouped fields
+        :param fields: Properties to group by
+        :param count_as: If set, add a per-group $count under this name
+        :return: self
+        """
+        aggregate = f", aggregate($count as {count_as})" if count_as else ""
+        self._apply = f"groupby(({', '.join(fields)}){aggregate})"
+        return self
+
+    def params(self) -> dict:
+        """
+        Build keyword arguments for an SDK get_*_list call
+        :return: Dict of list arguments
+        """
+        params = {}
+        if self._select:
+            params["select"] = ",".join(self._select)
+        if self._filters:
+            params["filter"] = " and ".join(f"({f})" if len(self._filters) > 1 else f for f in self._filters)
+        if self._orderby:
+            params["orderby"] = ",".join(self._orderby)
+        if self._apply:
+            params["apply"] = self._apply
+        return params
+
+    def run(self, list_call):
+        """
+        Run the query against a get_*_list method
+        :param list_call: SDK list method (e.g., ComputeApi(client).get_compute_rack_unit_list)
+        :return: List of dicts for group_by queries, otherwise a generator of objects (paged with iter_list)
+        """
+        if self._apply:
+            return list_call(**self.params()).results
+        return iter_list(list_call, **self.params())
+
+
+def distinct_values(list_call, field: str, filter=None) -> list:
+    """
+    Get the distinct values of a property, computed server-side with $apply=groupby
+    :param list_call: SDK list method
+    :param field: Property name (e.g., "Model")
+    :param filter: Optional $filter expression applied before grouping
+    :return: Sorted list of distinct non-empty values
+    """
+    query = Query().group_by(field)
+    if filter:
+        query.where(filter)
+    return sorted(row[field] for row in query.run(list_call) if row.get(field))
+
+
+def count_by(list_call, field: str, filter=None) -> dict:
+    """
+    Count objects per value of a property, computed server-side with $apply=groupby(..., aggregate($count))
+    :param list_call: SDK list method
+    :param field: Property name (e.g., "Model")
+    :param filter: Optional $filter expression applied before grouping
+    :return: Dict of value -> count
+    """
+    query = Query().group_by(field, count_as="Total")
+    if filter:
+        query.where(filter)
+    return {row.get(field): int(row["Total"]) for row in query.run(list_call)}
+
+
+class InventoryStore:
+    """
+    Local SQLite snapshot of Intersight objects (keyed by object type and Moid) with a ModTime watermark per type
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS objects "
+                "(object_type TEXT, moid TEXT, mod_time TEXT, data TEXT, PRIMARY KEY (object_type, moid))"
+            )
+            self.conn.execute("CREATE TABLE IF NOT EXISTS watermarks (object_type TEXT PRIMARY KEY, mod_time TEXT)")
+
+    def watermark(self, object_type):
+        """
+        Get the newest ModTime stored for an object type
+        :param object_type: Intersight object type (e.g., "compute.RackUnit")
+        :return: ModTime string, or None if the type has never been synced
+        """
+        row = self.conn.execute("SELECT mod_time FROM watermarks WHERE object_type = ?", (object_type,)).fetchone()
+        return row[0] if row else None
+
+    def mod_times(self, object_type):
+        """
+        Get the stored ModTime of every object of a type
+        :param object_type: Intersight object type
+        :return: Dict of Moid -> ModTime
+        """
+        return dict(self.conn.execute("SELECT moid, mod_time FROM objects WHERE object_type = ?", (object_type,)))
+
+    def apply(self, object_type, changed, removed_moids, watermark):
+        """
+        Upsert changed objects, delete removed ones and move the watermark in a single transaction
+        :param object_type: Intersight object type
+        :param changed: List of object dicts (raw API JSON)
+        :param removed_moids: Moids no longer in Intersight
+        :param watermark: New ModTime watermark
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO objects (object_type, moid, mod_time, data) VALUES (?, ?, ?, ?)",
+                [(object_type, o["Moid"], o.get("ModTime"), json.dumps(o)) for o in changed]
+            )
+            self.conn.executemany(
+                "DELETE FROM objects WHERE object_type = ? AND moid = ?",
+                [(object_type, moid) for moid in removed_moids]
+            )
+            if watermark:
+                self.conn.execute("INSERT OR REPLACE INTO watermarks (object_type, mod_time) VALUES (?, ?)",
+                                  (object_type, watermark))
+
+    def close(self):
+        self.conn.close()
+
+
+def sync_object_type(intersight_client, store, object_type) -> dict:
+    """
+    Delta sync one object type: fetch only objects modified since the watermark, reconcile Moids for deletions
+    :param intersight_client: Intersight API client
+    :param store: InventoryStore
+    :param object_type: Key of SYNC_CLASSES
+    :return: Dict of counts (total, added, updated, removed)
+    """
+    module_path, class_name, method = SYNC_CLASSES[object_type]
+    list_call = getattr(_sdk_class(module_path, class_name)(intersight_client), method)
+
+    known = store.mod_times(object_type)
+    watermark = store.watermark(object_type)
+
+    # Objects modified while the pages are fetched can move between $skip windows and be missed, so the next
+    # watermark is when this sync started (not the newest ModTime seen): those objects are re-read next time
+    started = datetime.now(timezone.utc) - timedelta(seconds=SYNC_WATERMARK_MARGIN)
+    new_watermark = started.strftime("%Y-%m-%dT%H:%M:%S.") + f"{started.microsecond // 1000:03d}Z"
+
+    # "ge" rather than "gt": objects modified in the same millisecond as the last sync are re-read, not missed
+    query = {"orderby": "ModTime,Moid"}
+    if watermark:
+        query["filter"] = f"ModTime ge {watermark}"
+    changed = [o for o in iter_list(list_call, raw=True, **query) if known.get(o["Moid"]) != o.get("ModTime")]
+
+    # Deletions don't show up in a ModTime query, compare the full Moid list (a few bytes per object)
+    current = {r.moid for r in iter_records(list_call, ["Moid"])}
+    removed = [moid for moid in known if moid not in current]
+
+    store.apply(object_type, changed, removed, new_watermark)
+
+    added = sum(1 for o in changed if o["Moid"] not in known)
+    return {"total": len(current), "added": added, "updated": len(changed) - added, "removed": len(removed)}
+
+
+def sync_inventory(intersight_client, db_path=INVENTORY_DB, object_types=None) -> dict:
+    """
+    Delta sync the configured object types into a local SQLite snapshot
+    :param intersight_client: Intersight API client
+    :param db_path: SQLite snapshot path
+    :param object_types: Object types to sync (default: all of SYNC_CLASSES)
+    :return: Dict of object type -> counts
+    """
+    store = InventoryStore(db_path)
+    results = {}
+    try:
+        for object_type in object_types or SYNC_CLASSES:
+            results[object_type] = sync_object_type(intersight_client, store, object_type)
+    finally:
+        store.close()
+
+    table = Table(title="Intersight Inventory Sync")
+    table.add_column("Object Type", style="cyan")
+    for column in ("Total", "Added", "Updated", "Removed"):
+        table.add_column(column, justify="right")
+    for object_type, counts in results.items():
+        table.add_row(object_type, str(counts["total"]), f"[green]{counts['added']}[/]",
+                      f"[yellow]{counts['updated']}[/]", f"[red]{counts['removed']}[/]")
+    console.print(table)
+    return results
+
+
+def _fetch_class(intersight_client, object_type) -> tuple:
+    """
+    Fetch every object of a SNAPSHOT_CLASSES type as raw JSON, timing the fetch
+    :param intersight_client: Intersight API client
+    :param object_type: Key of SNAPSHOT_CLASSES
+    :return: Tuple of (objects, seconds)
+    """
+    module_path, class_name, method = SNAPSHOT_CLASSES[object_type]
+    list_call = getattr(_sdk_class(module_path, class_name)(intersight_client), method)
+
+    start = time.perf_counter()
+    objects = list(iter_list(list_call, raw=True))
+    return objects, time.perf_counter() - start
+
+
+def snapshot_inventory(intersight_client, path=SNAPSHOT_FILE, object_types=None) -> dict:
+    """
+    Fetch several object classes concurrently (sharing the ApiClient connection pool) into one gzipped JSON file
+    :param intersight_client: Intersight API client
+    :param path: Snapshot file path
+    :param object_types: Object types to fetch (default: all of SNAPSHOT_CLASSES)
+    :return: Dict of object type -> (object count, seconds)
+    """
+    object_types = list(object_types or SNAPSHOT_CLASSES)
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=len(object_types)) as executor:
+        futures = {t: executor.submit(_fetch_class, intersight_client, t) for t in object_types}
+        fetched = {t: future.result() for t, future in futures.items()}
+    elapsed = time.perf_counter() - start
+
+    snapshot = {
+        "timestamp": int(time.time() * 1000),
+        "classes": {t: objects for t, (objects, _) in fetched.items()},
+    }
+    with gzip.open(path, "wt") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+
+    table = Table(title="Intersight Inventory Snapshot")
+    table.add_column("Object Type", style="cyan")
+    table.add_column("Objects", justify="right")
+    table.add_column("Time (s)", justify="right", style="magenta")
+    for t, (objects, seconds) in sorted(fetched.items(), key=lambda item: -item[1][1]):
+        table.add_row(t, str(len(objects)), f"{seconds:.2f}")
+    console.print(table)
+    console.print(f"[green]Snapshot written to {path}[/] ({os.path.getsize(path) / 1024:.0f} KB, {elapsed:.2f}s total)")
+
+    return {t: (len(objects), seconds) for t, (objects, seconds) in fetched.items()}
+
+
+def _call_json(intersight_client, method, path, body=None):
+    """
+    Send a raw JSON request through the ApiClient (signing, retries and pool are shared with the SDK calls)
+    :param intersight_client: Intersight API client
+    :param method: "GET", "POST", ...
+    :param path: API path (e.g., "/api/v1/bulk/Requests")
+    :param body: JSON body
+    :return: Parsed JSON response
+    """
+    response = intersight_client.call_api(
+        path, method,
+        header_params={"Accept": "application/json", "Content-Type": "application/json"},
+        body=body,
+        auth_settings=["cookieAuth", "http_signature", "oAuth2"],
+        _return_http_data_only=True,
+        _preload_content=False,
+    )
+    return json.loads(response.data or b"{}")
+
+
+_object_uris = {}
+
+
+def _object_uri(intersight_client, object_type: str) -> str:
+    """
+    Get the collection URI of an object type from the SDK's create endpoint (e.g., "ntp.Policy" -> "/v1/ntp/Policies")
+    :param intersight_client: Intersight API client
+    :param object_type: Intersight object type
+    :return: Collection URI relative to /api
+    """
+    if object_type not in _object_uris:
+        package, name = object_type.split(".")
+        try:
+            api = _sdk_class(f"api.{package}_api", f"{package.capitalize()}Api")(intersight_client)
+            endpoint = getattr(api, f"create_{package}_{_snake_case(name)}_endpoint")
+        except (ImportError, AttributeError):
+            raise ValueError(f"No create API for object type '{object_type}'")
+        _object_uris[object_type] = endpoint.settings["endpoint_path"][len("/api"):]
+    return _object_uris[object_type]
+
+
+def build_policies(intersight_client, spec: dict) -> list:
+    """
+    Stamp every policy in a spec into every listed organization
+    :param intersight_client: Intersight API client
+    :param spec: Dict with "organizations" (names) and "policies" (JSON bodies with ObjectType)
+    :return: List of (organization name, policy body)
+    """
+    orgs_api = _sdk_class("api.organization_api", "OrganizationApi")(intersight_client)
+    org_moids = {r.name: r.moid for r in iter_records(orgs_api.get_organization_organization_list, ["Name", "Moid"])}
+
+    missing = [name for name in spec["organizations"] if name not in org_moids]
+    if missing:
+        raise ValueError(f"Unknown organization(s): {', '.join(missing)}")
+
+    # Fail on unknown object types before creating anything
+    for policy in spec["policies"]:
+        _object_uri(intersight_client, policy["ObjectType"])
+
+    items = []
+    for org_name in spec["organizations"]:
+        organization = {"ObjectType": "organization.Organization", "Moid": org_moids[org_name]}
+        for policy in spec["policies"]:
+            items.append((org_name, dict(policy, Organization=organization)))
+    return items
+
+
+def _bulk_create(intersight_client, bodies: list) -> list:
+    """
+    Create objects with one bulk request
+    :param intersight_client: Intersight API client
+    :param bodies: Object bodies (at most BULK_CHUNK_SIZE)
+    :return: List of (status, Moid or error message), in the same order as bodies
+    """
+    bulk_request = {
+        "Requests": [
+            {"ObjectType": "bulk.RestSubRequest", "Verb": "POST",
+             "Uri": _object_uri(intersight_client, body["ObjectType"]), "Body": body}
+            for body in bodies
+        ]
+    }
+    response = _call_json(intersight_client, "POST", "/api/v1/bulk/Requests", bulk_request)
+
+    results = []
+    for result in response.get("Results") or []:
+        body = result.get("Body") or {}
+        status = result.get("Status")
+        results.append((status, body.get("Moid") if status and status < 300 else body.get("message", str(body))))
+
+    # Never report a sub-request as done if the response didn't include its result
+    results += [(None, "No result in bulk response")] * (len(bodies) - len(results))
+    return results
+
+
+def _create_one(intersight_client, body: dict) -> tuple:
+    """
+    Create one object with a regular POST
+    :param intersight_client: Intersight API client
+    :param body: Object body
+    :return: (status, Moid or error message)
+    """
+    ApiException = _sdk_class("exceptions", "ApiException")
+    try:
+        created = _call_json(intersight_client, "POST", "/api" + _object_uri(intersight_client, body["ObjectType"]),
+                             body)
+        return 200, created.get("Moid")
+    except ApiException as e:
+        return e.status, e.reason
+    except (HTTPError, OSError) as e:
+        # Connection errors only fail this object, not the whole batch
+        return None, str(e)
+
+
+def create_policies(intersight_client, items: list, use_bulk=True, workers=POLICY_WORKERS) -> list:
+    """
+    Create many policy objects: bulk requests in chunks, or a concurrent pool of single POSTs as a fallback
+    :param intersight_client: Intersight API client
+    :param items: List of (organization name, policy body) from build_policies
+    :param use_bulk: Try the bulk request API first
+    :param workers: Concurrent POSTs when not using bulk requests
+    :return: List of (organization name, policy name, status, Moid or error message)
+    """
+    ApiException = _sdk_class("exceptions", "ApiException")
+    bodies = [body for _, body in items]
+    results = []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for start in range(0, len(bodies), BULK_CHUNK_SIZE):
+            chunk = bodies[start:start + BULK_CHUNK_SIZE]
+            if use_bulk:
+                try:
+                    results.extend(_bulk_create(intersight_client, chunk))
+                    continue
+                except ApiException as e:
+                    # e.g., the account may not be allowed to use bulk requests
+                    console.print(f"[yellow]Bulk request failed ({e.status} {e.reason}), using single requests[/]")
+                    use_bulk = False
+                except (HTTPError, OSError) as e:
+                    console.print(f"[yellow]Bulk request failed ({e}), using single requests[/]")
+                    use_bulk = False
+            results.extend(executor.map(lambda body: _create_one(intersight_client, body), chunk))
+
+    return [(org, body.get("Name"), status, detail) for (org, body), (status, detail) in zip(items, results)]
+
+
+def create_policies_from_spec(intersight_client, spec_path, use_bulk=True, workers=POLICY_WORKERS) -> list:
+    """
+    Create the policies in a JSON spec file across organizations and report per-item results
+    :param intersight_client: Intersight API client
+    :param spec_path: JSON spec ({"organizations": [...], "policies": [{"ObjectType": "ntp.Policy", ...}]})
+    :param use_bulk: Try the bulk request API first
+    :param workers: Concurrent POSTs when not using bulk requests
+    :return: List of (organization name, policy name, status, Moid or error message)
+    """
+    with open(spec_path) as f:
+        spec = json.load(f)
+
+    results = create_policies(intersight_client, build_policies(intersight_client, spec), use_bulk, workers)
+
+    table = Table(title="Policy Creation")
+    table.add_column("Organization", style="cyan")
+    table.add_column("Policy", style="bold")
+    table.add_column("Status", justify="right")
+    table.add_column("Moid / Error")
+    for org, name, status, detail in results:
+        style = "green" if status and status < 300 else "red"
+        table.add_row(org, name or "N/A", f"[{style}]{status}[/]", str(detail))
+    console.print(table)
+
+    failed = sum(1 for _, _, status, _ in results if not status or status >= 300)
+    console.print(f"[green]{len(results) - failed} created[/], [red]{failed} failed[/]")
+    return results
+
+
 def get_compute_physical_summaries(intersight_client):
     """
     Get compute physical summaries from Intersight
     :param intersight_client: Intersight API client
     :return: List of compute physical summaries
     """
-    compute_api_instance = compute_api.ComputeApi(intersight_client)
+    compute_api_instance = _sdk_class("api.compute_api", "ComputeApi")(intersight_client)
     try:
-        response = compute_api_instance.get_compute_physical_summary_list()
+        response = list(iter_list(compute_api_instance.get_compute_physical_summary_list))
         console.print(response)
         return response
     except Exception as e:
@@ -138,9 +947,9 @@ def get_ntp_policies(intersight_client):
     :param intersight_client: Intersight API client
     :return: List of NTP policies
     """
-    ntp_api_instance = ntp_api.NtpApi(intersight_client)
+    ntp_api_instance = _sdk_class("api.ntp_api", "NtpApi")(intersight_client)
     try:
-        response = ntp_api_instance.get_ntp_policy_list()
+        response = list(iter_list(ntp_api_instance.get_ntp_policy_list))
         console.print(response)
         return response
     except Exception as e:
@@ -158,12 +967,12 @@ def create_ntp_policy(intersight_client):
     organization = _select_organization(intersight_client)
 
     # NTP API Instance, pick ntp servers
-    ntp_api_instance = ntp_api.NtpApi(intersight_client)
-    ntp_servers = ntp_api_instance.get_ntp_ntp_server_list()['results']
-    ntp_ips = _select_ntp_server_ips([s.to_dict() for s in ntp_servers])
+    ntp_api_instance = _sdk_class("api.ntp_api", "NtpApi")(intersight_client)
+    ntp_servers = iter_records(ntp_api_instance.get_ntp_ntp_server_list, ["ServerIpAddress"], as_dicts=True)
+    ntp_ips = _select_ntp_server_ips(list(ntp_servers))
 
     # Build policy object
-    ntp_policy = NtpPolicy(
+    ntp_policy = _sdk_class("model.ntp_policy", "NtpPolicy")(
         name="NTP-Policy-Example",
         enabled=True,
         ntp_servers=ntp_ips,
@@ -184,12 +993,12 @@ def list_rack_servers_filtered(client):
     List rack servers filtered by model
     :param client: Intersight API client
     """
-    compute_api_instance = compute_api.ComputeApi(client)
+    compute_api_instance = _sdk_class("api.compute_api", "ComputeApi")(client)
+    ApiException = _sdk_class("exceptions", "ApiException")
 
     try:
-        # Step 1: Retrieve distinct models (client-side only for discovery)
-        all_racks = compute_api_instance.get_compute_rack_unit_list(top=1000).results
-        models = sorted(set(r.model for r in all_racks if r.model))
+        # Step 1: Retrieve distinct models (server-side $apply=groupby, no rack objects transferred)
+        models = distinct_values(compute_api_instance.get_compute_rack_unit_list, "Model")
 
         # Step 2: Prompt user for selection
         table = Table(title="Available Rack Server Models")
@@ -204,9 +1013,9 @@ def list_rack_servers_filtered(client):
         selection = Prompt.ask("Select model by index", choices=[str(i) for i in range(len(models))])
         selected_model = models[int(selection)]
 
-        # Step 3: Use $filter to get servers with that model
-        filter_str = f"Model eq '{selected_model}'"
-        filtered_racks = compute_api_instance.get_compute_rack_unit_list(filter=filter_str).results
+        # Step 3: Use $filter to get servers with that model, $select only the columns we display
+        query = Query().select("Name", "Serial", "Moid").eq("Model", selected_model)
+        filtered_racks = query.run(compute_api_instance.get_compute_rack_unit_list)
 
         # Step 4: Display results
         result_table = Table(title=f"Rack Servers (Filtered): {selected_model}")
@@ -233,6 +1042,8 @@ exercises = {
     "2": ("Get NTP Policies", get_ntp_policies),
     "3": ("Create NTP Policy with Existing Servers", create_ntp_policy),
     "4": ("List Rack Servers after Apply Filters", list_rack_servers_filtered),
+    "5": ("Delta Sync Compute Inventory to SQLite", sync_inventory),
+    "6": ("Snapshot Compute, NTP and Firmware Inventory", snapshot_inventory),
 }
 
 
@@ -251,12 +1062,37 @@ def main_menu(intersight_client):
 
 
 if __name__ == "__main__":
-    # Authenticate with Intersight
-    intersight_client = get_intersight_client(INTERSIGHT_KEY_ID, INTERSIGHT_SECRET_FILE)
-    console.print("[bold green]Intersight Client Initialized Successfully![/bold green] Successfully authenticated.")
+    parser = argparse.ArgumentParser(description="Cisco Intersight SDK labs")
+    parser.add_argument("--sync", action="store_true", help="Delta sync the inventory to SQLite and exit (for cron)")
+    parser.add_argument("--db", default=INVENTORY_DB, help="SQLite snapshot path for --sync")
+    parser.add_argument("--snapshot", nargs="?", const=SNAPSHOT_FILE,
+                        help="Write a multi-class inventory snapshot (optionally to this path) and exit")
+    parser.add_argument("--policies", help="JSON spec of policies to create across organizations, then exit")
+    parser.add_argument("--no-bulk", action="store_true", help="Create policies with single requests only")
+    parser.add_argument("--workers", type=int, default=POLICY_WORKERS, help="Concurrent single policy requests")
+    parser.add_argument("--timing", action="store_true", help="Print signing/connection/server time per request")
+    args = parser.parse_args()
+
+    # Intersight client is created (and the SDK imported) on first use, so the menu shows up immediately
+    intersight_client = LazyApiClient(INTERSIGHT_KEY_ID, INTERSIGHT_SECRET_FILE)
+    console.print("[bold green]Intersight Client Configured![/bold green] Authenticates on first API call.")
+    timer = RequestTimer() if args.timing else None
 
     try:
-        # Run the main menu
-        main_menu(intersight_client)
+        if timer:
+            timer.install(intersight_client.client)
+
+        if args.sync:
+            sync_inventory(intersight_client, args.db)
+        elif args.snapshot:
+            snapshot_inventory(intersight_client, args.snapshot)
+        elif args.policies:
+            create_policies_from_spec(intersight_client, args.policies, not args.no_bulk, args.workers)
+        else:
+            # Run the main menu
+            main_menu(intersight_client)
     except Exception as e:
         console.print(f"[red]Error:[/] {e}")
+    finally:
+        if timer:
+            timer.print_summary()
@@ -0,0 +1,198 @@
+"""
+Benchmarks for deploy_services_profiles.py
+
+Usage:
+    python benchmarks.py records [--objects 20000] [--lookups 1000]
+    python benchmarks.py events
+"""
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from rich.console import Console
+from rich.table import Table
+
+from deploy_services_profiles import UCS, MoCache, MoTable, iter_out_configs, mo_from_element
+
+console = Console()
+
+# eventSubscribe stream as sent by UCS Manager: each event is its length in bytes on a line of its own, followed by
+# a complete <methodVessel> document with its own XML declaration
+RECORDED_EVENTS = [
+    b'<?xml version="1.0" encoding="UTF-8"?>\n<methodVessel cookie="c"><inStimuli><configMoChangeEvent cookie="" '
+    b'inEid="1001"><inConfig><lsServer dn="org-root/ls-web01" name="web01" assocState="unassociated" '
+    b'operState="unassociated" configState="not-applied" status="created"/></inConfig></configMoChangeEvent>'
+    b'</inStimuli></methodVessel>',
+    b'<?xml version="1.0" encoding="UTF-8"?>\n<methodVessel cookie="c"><inStimuli><configMoChangeEvent cookie="" '
+    b'inEid="1002"><inConfig><lsServer dn="org-root/ls-web01" assocState="associating" status="modified"/>'
+    b'</inConfig></configMoChangeEvent><configMoChangeEvent cookie="" inEid="1003"><inConfig>'
+    b'<lsServer dn="org-root/ls-db01" assocState="associated" status="modified"/></inConfig>'
+    b'</configMoChangeEvent></inStimuli></methodVessel>',
+    b'<?xml version="1.0" encoding="UTF-8"?>\n<methodVessel cookie="c"><inStimuli><configMoChangeEvent cookie="" '
+    b'inEid="1004"><inConfig><lsServer dn="org-root/ls-old01" status="deleted"/></inConfig>'
+    b'</configMoChangeEvent></inStimuli></methodVessel>',
+    b'<?xml version="1.0" encoding="UTF-8"?>\n<methodVessel cookie="c"><inStimuli><configMoChangeEvent cookie="" '
+    b'inEid="1005"><inConfig><computeBlade dn="sys/chassis-1/blade-1" operPower="off" status="modified"/>'
+    b'</inConfig></configMoChangeEvent></inStimuli></methodVessel>',
+]
+
+
+def _blade_xml(i: int) -> str:
+    """
+    Build a synthetic computeBlade as returned by configResolveClass
+    :param i: Index, used to make values unique
+    :return: computeBlade XML
+    """
+    chassis, slot = i // 8 + 1, i % 8 + 1
+    return (
+        f'<computeBlade adminPower="policy" adminState="in-service" assignedToDn="org-root/ls-sp{i}" '
+        f'association="associated" availability="unavailable" availableMemory="262144" chassisId="{chassis}" '
+        f'checkPoint="discovered" childAction="deleteNonPresent" connPath="A,B" connStatus="A,B" descr="" '
+        f'discovery="complete" dn="sys/chassis-{chassis}/blade-{slot}" fltAggr="0" fsmDescr="" '
+        f'fsmStatus="nop" lc="undiscovered" lcTs="1970-01-01T00:00:00.000" lowVoltageMemory="not-applicable" '
+        f'managingInst="A" memorySpeed="2400" model="UCSB-B200-M5" name="" numOfAdaptors="1" numOfCores="40" '
+        f'numOfCpus="2" numOfEthHostIfs="4" numOfFcHostIfs="2" numOfThreads="80" operPower="on" '
+        f'operQualifier="" operState="ok" operability="operable" originalUuid="1b4e28ba-2fa1-11d2-{i:04x}-b9a761bde3fb" '
+        f'partNumber="73-17984-03" presence="equipped" revision="0" rn="blade-{slot}" serial="FCH{i:08d}" '
+        f'serverId="{chassis}/{slot}" slotId="{slot}" totalMemory="262144" usrLbl="" '
+        f'uuid="1b4e28ba-2fa1-11d2-{i:04x}-b9a761bde3fb" vendor="Cisco Systems Inc"/>'
+    )
+
+
+def _measure(func):
+    """
+    Run func under tracemalloc
+    :param func: Callable to measure (its result is kept alive until the measurement is taken)
+    :return: Tuple of (result, seconds, retained bytes, peak bytes)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained, peak
+
+
+def benchmark_records(objects: int, lookups: int) -> bool:
+    """
+    Compare a full Element tree (ET.fromstring, as _send_request does) with compact records built while parsing
+    :param objects: Number of computeBlade objects in the synthetic response
+    :param lookups: Number of DN lookups to time
+    :return: True (informational benchmark)
+    """
+    body = ('<configResolveClass cookie="c" response="yes" classId="computeBlade"><outConfigs>'
+            + "".join(_blade_xml(i) for i in range(objects))
+            + '</outConfigs></configResolveClass>').encode()
+    dns = [f"sys/chassis-{i // 8 + 1}/blade-{i % 8 + 1}" for i in range(0, objects, max(1, objects // lookups))]
+
+    tree, tree_time, tree_retained, tree_peak = _measure(lambda: ET.fromstring(body))
+    table, table_time, table_retained, table_peak = _measure(
+        lambda: MoTable(mo_from_element(mo) for mo in iter_out_configs(io.BytesIO(body))))
+
+    # DN lookup: walk outConfigs (what callers do with the Element tree) vs the DN index
+    out_configs = tree.find("outConfigs")
+    start = time.perf_counter()
+    for dn in dns:
+        next(mo for mo in out_configs if mo.attrib.get("dn") == dn)
+    tree_lookup = (time.perf_counter() - start) / len(dns)
+    start = time.perf_counter()
+    for dn in dns:
+        table.get(dn)
+    table_lookup = (time.perf_counter() - start) / len(dns)
+
+    result = Table(title=f"{objects} computeBlade objects ({len(body) / 1024 / 1024:.1f} MB of XML)")
+    result.add_column("Representation", style="cyan")
+    result.add_column("Parse (s)", justify="right", style="magenta")
+    result.add_column("Retained (MB)", justify="right", style="green")
+    result.add_column("Peak (MB)", justify="right", style="green")
+    result.add_column("DN Lookup (µs)", justify="right")
+    for name, elapsed, retained, peak, lookup in (
+        ("Element tree", tree_time, tree_retained, tree_peak, tree_lookup),
+        ("ManagedObject records", table_time, table_retained, table_peak, table_lookup),
+    ):
+        result.add_row(name, f"{elapsed:.3f}", f"{retained / 1024 / 1024:.1f}", f"{peak / 1024 / 1024:.1f}",
+                       f"{lookup * 1e6:.1f}")
+    console.print(result)
+    return True
+
+
+class _RecordedClient:
+    """
+    Stand-in for the cache's UCS client: serves the seed resync, the full objects fetched for unknown DNs and the
+    recorded event stream
+    """
+
+    cookie = "c"
+
+    def __init__(self, stream: bytes):
+        self.stream = stream
+        self.seed = [ET.Element("lsServer", dn="org-root/ls-old01", name="old01", assocState="associated")]
+        self.full = {"org-root/ls-db01": ET.Element("lsServer", dn="org-root/ls-db01", name="db01",
+                                                    assocState="associated", operState="ok", configState="applied")}
+
+    def _post(self, body, stream=False, timeout=None):
+        response = type("Response", (), {"close": lambda self: None})()
+        response.raw = io.BytesIO(self.stream)
+        return response
+
+    def config_resolve_classes(self, classIds, hierarchical=False):
+        return {"lsServer": list(self.seed)}
+
+    def config_resolve_dns(self, dns, hierarchical=False):
+        return {dn: self.full[dn] for dn in dns if dn in self.full}
+
+
+def check_events() -> bool:
+    """
+    Replay a recorded eventSubscribe stream through MoCache and check the resulting cache contents
+    :return: True if every check passed
+    """
+    stream = b"".join(str(len(document)).encode() + b"\n" + document for document in RECORDED_EVENTS)
+    cache = MoCache(UCS("ucs", "admin", "password"), ["lsServer"])
+    cache.client = _RecordedClient(stream)
+    cache._subscribe()
+
+    web01, db01 = cache.get("org-root/ls-web01"), cache.get("org-root/ls-db01")
+    checks = [
+        ("created object is cached with all attributes",
+         web01 is not None and web01.attrib.get("name") == "web01"),
+        ("modified event is merged into the cached object",
+         web01 is not None and web01.attrib.get("assocState") == "associating"
+         and web01.attrib.get("operState") == "unassociated"),
+        ("modified event for an unknown DN fetches the full object",
+         db01 is not None and db01.attrib.get("configState") == "applied"),
+        ("deleted event removes the object", cache.get("org-root/ls-old01") is None),
+        ("events for classes that aren't cached are ignored", cache.get("sys/chassis-1/blade-1") is None),
+        ("every event was applied", cache.events_applied == 4),
+        ("reads fall back to UCS Manager once the stream has ended", not cache.covers("lsServer")),
+    ]
+
+    passed = True
+    for description, ok in checks:
+        console.print(f"{'[green]PASS[/green]' if ok else '[bold red]FAIL[/bold red]'}: {description}")
+        passed = passed and ok
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Raw UCS XML client benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    records_parser = subparsers.add_parser("records", help="Element tree vs __slots__ records")
+    records_parser.add_argument("--objects", type=int, default=20000, help="Objects in the synthetic response")
+    records_parser.add_argument("--lookups", type=int, default=1000, help="DN lookups to time")
+
+    subparsers.add_parser("events", help="Replay a recorded eventSubscribe stream through MoCache")
+
+    args = parser.parse_args()
+
+    ok = True
+    if args.benchmark == "records":
+        ok = benchmark_records(args.objects, args.lookups)
+    elif args.benchmark == "events":
+        ok = check_events()
+    sys.exit(0 if ok else 1)
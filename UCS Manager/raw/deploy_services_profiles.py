@@ -1,12 +1,20 @@
 import argparse
+import csv
 import os
+import re
+import socket
+import sys
+import threading
+import time
 from xml.dom import minidom
+from xml.sax.saxutils import quoteattr
 
 import requests
 import xml.etree.ElementTree as ET
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.syntax import Syntax
+from rich.table import Table
 
 # Rich console
 console = Console()
@@ -18,6 +26,24 @@ UCS_HOST = os.getenv("UCS_HOST")
 UCS_USER = os.getenv("UCS_USER")
 UCS_PASSWORD = os.getenv("UCS_PASSWORD")
 
+# Pretty-print every XML request/response (slow on large responses, for debugging only)
+DEBUG_XML = os.getenv("UCS_DEBUG_XML", "").lower() in ("1", "true", "yes")
+
+# Batch provisioning: association polling
+ASSOC_POLL_INTERVAL = 5
+ASSOC_DEADLINE = 900
+ASSOC_FINAL_STATES = {"associated", "failed"}
+
+# ManagedObject records: attribute values up to this length are interned
+MO_INTERN_MAX_LENGTH = 16
+
+# Event-driven MO cache: reconnect if the event stream is silent this long, reconnect backoff bounds, and how long
+# a stream has to stay up before the backoff is reset
+EVENT_READ_TIMEOUT = 600
+RECONNECT_BACKOFF_MIN = 1
+RECONNECT_BACKOFF_MAX = 60
+RECONNECT_STABLE_AFTER = 60
+
 # Disable warnings for insecure HTTPS requests
 requests.packages.urllib3.disable_warnings()
 
@@ -36,12 +62,254 @@ def print_xml(xml_string: str):
         console.print(xml_string)
 
 
+def property_filter(op, class_id, prop, value):
+    """
+    Build a UCSM property filter for inFilter (evaluated on the Fabric Interconnect)
+    :param op: Filter operator: "eq", "ne", "gt", "ge", "lt", "le", "wcard" (regex), "anybit", "allbits"
+    :param class_id: Class the property belongs to (e.g., "lsServer")
+    :param prop: Property name (e.g., "type")
+    :param value: Value to compare with (a regular expression for "wcard")
+    :return: Filter XML
+    """
+    return f'<{op} class={quoteattr(class_id)} property={quoteattr(prop)} value={quoteattr(str(value))}/>'
+
+
+def and_filter(*filters):
+    """
+    Combine filters with a logical AND
+    :param filters: Filter XML strings
+    :return: Filter XML
+    """
+    return filters[0] if len(filters) == 1 else f'<and>{"".join(filters)}</and>'
+
+
+def or_filter(*filters):
+    """
+    Combine filters with a logical OR
+    :param filters: Filter XML strings
+    :return: Filter XML
+    """
+    return filters[0] if len(filters) == 1 else f'<or>{"".join(filters)}</or>'
+
+
+def not_filter(in_filter):
+    """
+    Negate a filter
+    :param in_filter: Filter XML string
+    :return: Filter XML
+    """
+    return f'<not>{in_filter}</not>'
+
+
+class ManagedObject:
+    """
+    Compact managed object record. One __slots__ subclass is created per UCSM class and attribute set
+    (see mo_record_class), attribute names are interned and shared by every record of that class
+    """
+    __slots__ = ()
+    # UCSM class ID and XML attribute names, in the same order as __slots__
+    class_id = None
+    _fields = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def get(self, name, default=None):
+        """
+        Get an attribute by its XML name (same as Element.attrib.get)
+        :param name: Attribute name (e.g., "assocState")
+        :param default: Value if the attribute is missing
+        :return: Attribute value
+        """
+        try:
+            return getattr(self, self._slot_names[name])
+        except KeyError:
+            return default
+
+    @property
+    def attrib(self):
+        """
+        Attributes as a dict, for code written against Element.attrib
+        :return: Dict of attribute name -> value
+        """
+        return {field: getattr(self, slot) for field, slot in zip(self._fields, self.__slots__)}
+
+    def __repr__(self):
+        return f"<{self.class_id} dn={self.get('dn')!r}>"
+
+
+_mo_record_classes = {}
+
+
+def mo_record_class(class_id, fields):
+    """
+    Get (or create) the record class for a UCSM class and attribute set
+    :param class_id: UCSM class ID (element tag, e.g., "computeBlade")
+    :param fields: Tuple of XML attribute names
+    :return: ManagedObject subclass
+    """
+    key = (class_id, fields)
+    cls = _mo_record_classes.get(key)
+    if cls is None:
+        fields = tuple(sys.intern(f) for f in fields)
+        # Attribute names are identifiers in practice, anything else (or a clash with a method) is mapped to one
+        slots = tuple(re.sub(r"\W", "_", f) + ("_" if hasattr(ManagedObject, f) else "") for f in fields)
+        cls = type(class_id, (ManagedObject,), {
+            "__slots__": slots,
+            "class_id": sys.intern(class_id),
+            "_fields": fields,
+            "_slot_names": dict(zip(fields, slots)),
+        })
+        _mo_record_classes[key] = cls
+    return cls
+
+
+def mo_from_element(elem):
+    """
+    Convert a parsed managed object element into a compact record (children are not kept)
+    :param elem: Managed object element
+    :return: ManagedObject record
+    """
+    # Short values are mostly enums ("ok", "equipped", "in-service"), share one copy across all records
+    values = [sys.intern(v) if len(v) <= MO_INTERN_MAX_LENGTH else v for v in elem.attrib.values()]
+    return mo_record_class(elem.tag, tuple(elem.attrib))(*values)
+
+
+def iter_out_configs(source):
+    """
+    Parse a UCSM response incrementally, yielding each managed object under <outConfigs> once it is complete
+    :param source: File-like object with the response XML (e.g., a streamed HTTP response)
+    :return: Generator of managed object elements (detached from the tree after they are yielded)
+    """
+    try:
+        depth = 0
+        out_configs = None
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    UCS._raise_for_error(elem)
+                elif depth == 2 and elem.tag == "outConfigs":
+                    out_configs = elem
+                continue
+
+            depth -= 1
+            if elem is out_configs:
+                # Anything after <outConfigs> (e.g., <outUnresolved>) is not a managed object
+                out_configs = None
+            elif depth == 2 and out_configs is not None:
+                yield elem
+                # Detach so parsed objects don't pile up under <outConfigs>
+                out_configs.remove(elem)
+    except ET.ParseError as e:
+        raise Exception(f"Failed to parse XML: {e}")
+
+
+def iter_event_documents(source):
+    """
+    Split an eventSubscribe stream into its event documents. Each event is sent as a line with its length in
+    bytes followed by a complete XML document (with its own XML declaration), as read by ucsmsdk
+    :param source: File-like object with the event stream (e.g., a streamed HTTP response)
+    :return: Generator of XML documents (bytes), ends when the stream is closed
+    """
+    while True:
+        line = source.readline()
+        if not line:
+            return
+        if not line.strip():
+            continue
+
+        length = int(line)
+        document = b""
+        while len(document) < length:
+            chunk = source.read(length - len(document))
+            if not chunk:
+                return
+            document += chunk
+        yield document
+
+
+class MoTable:
+    """
+    Managed object records indexed by DN, with DN-based lookups
+    """
+
+    def __init__(self, mos=()):
+        self.by_dn = {mo.get("dn"): mo for mo in mos}
+
+        # Parent DN -> child DNs (dict used as an ordered set). Intermediate DNs that aren't records themselves
+        # (e.g., "sys/chassis-1" in a table of blades) are indexed too, so under() can walk down through them
+        self.by_parent = {}
+        for dn in self.by_dn:
+            while "/" in dn:
+                parent = dn.rsplit("/", 1)[0]
+                siblings = self.by_parent.setdefault(parent, {})
+                if dn in siblings:
+                    break
+                siblings[dn] = None
+                dn = parent
+
+    def __len__(self):
+        return len(self.by_dn)
+
+    def __iter__(self):
+        return iter(self.by_dn.values())
+
+    def get(self, dn):
+        """
+        Get a record by DN
+        :param dn: Distinguished name
+        :return: ManagedObject, or None
+        """
+        return self.by_dn.get(dn)
+
+    def parent(self, dn):
+        """
+        Get the parent record of a DN (e.g., "sys/chassis-1" for "sys/chassis-1/blade-1")
+        :param dn: Distinguished name
+        :return: ManagedObject, or None if the parent is not in the table
+        """
+        return self.by_dn.get(dn.rsplit("/", 1)[0]) if "/" in dn else None
+
+    def children(self, dn):
+        """
+        Get the direct children of a DN
+        :param dn: Distinguished name
+        :return: List of ManagedObject
+        """
+        return [self.by_dn[child] for child in self.by_parent.get(dn, ()) if child in self.by_dn]
+
+    def under(self, dn):
+        """
+        Get every record below a DN (e.g., all blades of a chassis)
+        :param dn: Distinguished name
+        :return: List of ManagedObject
+        """
+        found = []
+        pending = [dn]
+        while pending:
+            for child in self.by_parent.get(pending.pop(), ()):
+                if child in self.by_dn:
+                    found.append(self.by_dn[child])
+                pending.append(child)
+        return found
+
+    def where(self, **attrs):
+        """
+        Get records whose attributes all match
+        :param attrs: Attribute name -> value (e.g., operState="ok")
+        :return: List of ManagedObject
+        """
+        return [mo for mo in self.by_dn.values() if all(mo.get(k) == v for k, v in attrs.items())]
+
+
 class UCS:
     """
     Class to interact with Cisco UCS Manager API (raw XML, no SDK)
     """
 
-    def __init__(self, host, username, password):
+    def __init__(self, host, username, password, debug=DEBUG_XML):
         self.host = host
         self.username = username
         self.password = password
@@ -52,14 +320,44 @@ class UCS:
         self.headers = {
             "Content-Type": "application/xml"
         }
+        self.debug = debug
+        # Optional event-driven MO cache (see enable_cache)
+        self.cache = None
 
-    def _send_request(self, body):
+    def _debug_xml(self, title, root):
         """
-        Internal helper to send XML body, check HTTP, parse XML, and raise UCSM errors
+        Pretty print an XML element, only in debug mode (serializing and re-parsing large responses is slow)
+        :param title: Title printed above the XML
+        :param root: XML element
+        """
+        if not self.debug:
+            return
+        console.print(title)
+        print_xml(ET.tostring(root, encoding="unicode"))
+
+    @staticmethod
+    def _raise_for_error(root):
+        """
+        Raise UCSM errors (an <error> response, or errorCode on the method response)
+        :param root: Response root element (attributes are enough, children may not be parsed yet)
+        """
+        if root.tag == "error" or "errorCode" in root.attrib:
+            error_descr = root.attrib.get("errorDescr", "Unknown error")
+            error_code = root.attrib.get("errorCode", "Unknown code")
+            raise Exception(f"UCSM Error [{error_code}]: {error_descr}")
+
+    def _post(self, body, stream=False, timeout=None):
+        """
+        POST an XML body to UCS Manager and check the HTTP status
+        :param body: XML request body
+        :param stream: Don't read the response body up front
+        :param timeout: requests timeout (connect, read)
+        :return: requests Response
         """
         # POST request to base URL (UCS Manager)
         try:
-            response = self.session.post(self.base_url, headers=self.headers, data=body)
+            response = self.session.post(self.base_url, headers=self.headers, data=body, stream=stream,
+                                         timeout=timeout)
         except requests.exceptions.RequestException as e:
             raise Exception(f"Request failed: {e}")
 
@@ -67,20 +365,40 @@ class UCS:
         if response.status_code != 200:
             raise Exception(f"HTTP Error: {response.status_code} - {response.text}")
 
-        # Parse XML Response
+        return response
+
+    def _send_request(self, body):
+        """
+        Internal helper to send XML body, check HTTP, parse XML, and raise UCSM errors
+        """
+        response = self._post(body)
+
+        # Parse XML Response (from bytes, the XML declaration decides the encoding)
         try:
-            root = ET.fromstring(response.text)
+            root = ET.fromstring(response.content)
         except ET.ParseError as e:
             raise Exception(f"Failed to parse XML: {e}")
 
         # Check for UCSM error
-        if root.tag == "error":
-            error_descr = root.attrib.get("errorDescr", "Unknown error")
-            error_code = root.attrib.get("errorCode", "Unknown code")
-            raise Exception(f"UCSM Error [{error_code}]: {error_descr}")
+        self._raise_for_error(root)
 
         return root
 
+    def _iter_request(self, body):
+        """
+        Send an XML body and parse the response incrementally, yielding each managed object under <outConfigs>
+        as soon as it has been received (the full response is never held in memory)
+        :param body: XML request body
+        :return: Generator of managed object elements
+        """
+        response = self._post(body, stream=True)
+        response.raw.decode_content = True
+
+        try:
+            yield from iter_out_configs(response.raw)
+        finally:
+            response.close()
+
     def login(self):
         """
         Login to UCS Manager and retrieve the cookie
@@ -96,26 +414,111 @@ class UCS:
         """
         Logout from UCS Manager
         """
+        if self.cache:
+            self.cache.stop()
+            self.cache = None
+
         body = f'<aaaLogout inCookie="{self.cookie}"/>'
         self._send_request(body)
         console.print("[green]Logout successful![/]")
 
-    def config_resolve_class(self, classId):
+    def enable_cache(self, classIds):
+        """
+        Serve reads of these classes from a local cache kept current by UCSM change events
+        :param classIds: Class IDs to cache (e.g., ["lsServer", "computeBlade"])
+        :return: MoCache
+        """
+        self.cache = MoCache(self, classIds)
+        self.cache.start()
+        return self.cache
+
+    def _resolve_class_body(self, classId, in_filter=None, hierarchical=False):
+        """
+        Build a configResolveClass request
+        :param classId: The class ID to resolve
+        :param in_filter: Optional filter XML (see property_filter, and_filter, or_filter, not_filter)
+        :param hierarchical: Include child objects
+        :return: XML request body
+        """
+        hierarchical = "true" if hierarchical else "false"
+        if not in_filter:
+            return f'<configResolveClass cookie="{self.cookie}" classId="{classId}" inHierarchical="{hierarchical}"/>'
+        return (f'<configResolveClass cookie="{self.cookie}" classId="{classId}" inHierarchical="{hierarchical}">'
+                f'<inFilter>{in_filter}</inFilter></configResolveClass>')
+
+    def config_resolve_class(self, classId, in_filter=None, hierarchical=False):
         """
         Resolve a class in UCS Manager
         :param classId: The class ID to resolve (e.g., "orgOrg", "lsServer")
+        :param in_filter: Optional filter XML, evaluated by UCS Manager (e.g., property_filter("eq", ...))
+        :param hierarchical: Include child objects
         :return: Parsed XML response
         """
-        body = f'<configResolveClass cookie="{self.cookie}" classId="{classId}" inHierarchical="false"/>'
+        body = self._resolve_class_body(classId, in_filter, hierarchical)
         root = self._send_request(body)
 
-        # Pretty print the XML response
-        console.print(f"Resolved Class XML for [blue]{classId}:[/]")
-        xml_str = ET.tostring(root, encoding="unicode")
-        print_xml(xml_str)
+        # Pretty print the XML response (debug only)
+        self._debug_xml(f"Resolved Class XML for [blue]{classId}:[/]", root)
 
         return root
 
+    def iter_resolve_class(self, classId, in_filter=None, hierarchical=False):
+        """
+        Resolve a class in UCS Manager, streaming the managed objects as they are parsed
+        :param classId: The class ID to resolve (e.g., "orgOrg", "lsServer")
+        :param in_filter: Optional filter XML, evaluated by UCS Manager
+        :param hierarchical: Include child objects
+        :return: Generator of managed object elements
+        """
+        if self.cache and self.cache.covers(classId) and not in_filter and not hierarchical:
+            return iter(self.cache.find(classId))
+        return self._iter_request(self._resolve_class_body(classId, in_filter, hierarchical))
+
+    def resolve_class_table(self, classId, in_filter=None):
+        """
+        Resolve a class into compact records, converted as the response is parsed (no Element tree is kept)
+        :param classId: The class ID to resolve (e.g., "computeBlade")
+        :param in_filter: Optional filter XML, evaluated by UCS Manager
+        :return: MoTable of ManagedObject records
+        """
+        return MoTable(mo_from_element(mo) for mo in self.iter_resolve_class(classId, in_filter))
+
+    def config_resolve_classes(self, classIds, hierarchical=False):
+        """
+        Resolve several classes in one round trip (configResolveClasses)
+        :param classIds: Class IDs to resolve (e.g., ["lsServer", "computeBlade"])
+        :param hierarchical: Include child objects
+        :return: Dict of class ID -> list of managed object elements
+        """
+        ids = "".join(f'<Id value={quoteattr(class_id)}/>' for class_id in classIds)
+        body = (f'<configResolveClasses cookie="{self.cookie}" inHierarchical="{"true" if hierarchical else "false"}">'
+                f'<inIds>{ids}</inIds></configResolveClasses>')
+
+        result = {class_id: [] for class_id in classIds}
+        for mo in self._iter_request(body):
+            result.setdefault(mo.tag, []).append(mo)
+        return result
+
+    def config_resolve_dns(self, dns, hierarchical=False):
+        """
+        Resolve several DNs in one round trip (configResolveDns)
+        :param dns: Distinguished names (e.g., ["org-root/ls-web01", "sys/chassis-1/blade-1"])
+        :param hierarchical: Include child objects
+        :return: Dict of DN -> managed object element (DNs that don't exist are left out)
+        """
+        result = {}
+        if self.cache and self.cache.is_current() and not hierarchical:
+            result = {dn: mo for dn, mo in ((dn, self.cache.get(dn)) for dn in dns) if mo is not None}
+            dns = [dn for dn in dns if dn not in result]
+            if not dns:
+                return result
+
+        dn_list = "".join(f'<dn value={quoteattr(dn)}/>' for dn in dns)
+        body = (f'<configResolveDns cookie="{self.cookie}" inHierarchical="{"true" if hierarchical else "false"}">'
+                f'<inDns>{dn_list}</inDns></configResolveDns>')
+        result.update((mo.attrib.get("dn"), mo) for mo in self._iter_request(body))
+        return result
+
     def config_configure_object(self, payload):
         """
         Configure an object in UCS Manager
@@ -124,41 +527,385 @@ class UCS:
         """
         body = (f'<configConfMo cookie="{self.cookie}" inHierarchical="false"><inConfig>{payload}</inConfig'
                 f'></configConfMo>')
-        print(body)
         root = self._send_request(body)
 
-        # Pretty print the XML response\
-        console.print(f"Configured XML for [blue]{payload}:[/]")
-        xml_str = ET.tostring(root, encoding="unicode")
-        print_xml(xml_str)
+        # Pretty print the XML response (debug only)
+        self._debug_xml(f"Configured XML for [blue]{payload}:[/]", root)
 
         return root
 
+    def config_configure_objects(self, configs):
+        """
+        Configure several objects in a single transaction (configConfMos)
+        :param configs: Dict of DN -> XML payload of the object (children included)
+        :return: Dict of DN -> configured managed object element
+        """
+        pairs = "".join(f'<pair key={quoteattr(dn)}>{payload}</pair>' for dn, payload in configs.items())
+        body = (f'<configConfMos cookie="{self.cookie}" inHierarchical="false"><inConfigs>{pairs}</inConfigs>'
+                f'</configConfMos>')
+        root = self._send_request(body)
+
+        # Pretty print the XML response (debug only)
+        self._debug_xml(f"Configured XML for [blue]{len(configs)} objects:[/]", root)
+
+        out_configs = root.find("outConfigs")
+        pairs = out_configs if out_configs is not None else []
+        return {pair.attrib.get("key"): next(iter(pair), None) for pair in pairs}
+
+    def instantiate_service_profiles(self, template, profiles, org_dn="org-root"):
+        """
+        Create Service Profiles from a template and bind them to servers in one configConfMos transaction
+        (instead of one lsServer and one lsBinding request per profile)
+        :param template: Service Profile Template name
+        :param profiles: List of (Service Profile name, target server DN)
+        :param org_dn: Organization of the template and new profiles
+        :return: Dict of Service Profile DN -> configured lsServer element
+        """
+        configs = {}
+        for name, target_dn in profiles:
+            dn = f"{org_dn}/ls-{name}"
+            if dn in configs:
+                raise ValueError(f"Duplicate Service Profile name '{name}'")
+            configs[dn] = (
+                f'<lsServer dn={quoteattr(dn)} name={quoteattr(name)} srcTemplName={quoteattr(template)}>'
+                f'<lsBinding rn="pn" pnDn={quoteattr(target_dn)} restrictMigration="no"/>'
+                f'</lsServer>'
+            )
+        return self.config_configure_objects(configs)
+
+    def wait_for_associations(self, dns, deadline=ASSOC_DEADLINE, interval=ASSOC_POLL_INTERVAL):
+        """
+        Poll the association state of Service Profiles (one configResolveDns per poll for all of them)
+        :param dns: Service Profile DNs
+        :param deadline: Seconds to wait before giving up on the remaining profiles
+        :param interval: Seconds between polls
+        :return: Dict of DN -> (assocState, operState, configState)
+        """
+        states = {dn: ("unknown", "unknown", "unknown") for dn in dns}
+        pending = set(dns)
+        end = time.monotonic() + deadline
+
+        while pending:
+            for dn, mo in self.config_resolve_dns(sorted(pending)).items():
+                states[dn] = (mo.attrib.get("assocState"), mo.attrib.get("operState"), mo.attrib.get("configState"))
+                if states[dn][0] in ASSOC_FINAL_STATES:
+                    pending.discard(dn)
+
+            if not pending or time.monotonic() + interval > end:
+                break
+            console.print(f"[yellow]{len(pending)} of {len(dns)} Service Profiles still associating...[/]")
+            time.sleep(interval)
+
+        return states
+
+
+class MoCache:
+    """
+    Local managed object cache indexed by DN and by class. Seeded with one configResolveClasses and kept current
+    by the eventSubscribe change stream (reconnects and resyncs when the stream drops)
+    """
+
+    def __init__(self, ucs, classIds):
+        # Own client (and HTTP session) for the long-lived event stream and resyncs
+        self.client = UCS(ucs.host, ucs.username, ucs.password)
+        self.client.base_url = ucs.base_url
+        self.client.session.verify = ucs.session.verify
+        self.client.cookie = ucs.cookie
+        self.class_ids = set(classIds)
+
+        self.by_dn = {}
+        self.by_class = {class_id: {} for class_id in self.class_ids}
+        self.lock = threading.Lock()
+
+        # Staleness metrics
+        self.connected = False
+        self.synced_at = None
+        self.last_event_at = None
+        self.disconnected_at = time.time()
+        self.events_applied = 0
+        self.resyncs = 0
+        self.last_error = None
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._response = None
+        self._logged_in = False
+
+    def is_current(self):
+        """
+        Check if the cache can answer reads: seeded and following the event stream. While disconnected, changes
+        are missed until the next resync, so reads go to UCS Manager instead
+        :return: True if the cache is current
+        """
+        return self.connected and self.synced_at is not None
+
+    def covers(self, classId):
+        """
+        Check if a class is cached (and the cache is current)
+        :param classId: Class ID
+        :return: True if reads of this class can be served from the cache
+        """
+        return classId in self.class_ids and self.is_current()
+
+    def get(self, dn):
+        """
+        Get a cached managed object by DN
+        :param dn: Distinguished name
+        :return: Managed object element, or None if not cached
+        """
+        with self.lock:
+            return self.by_dn.get(dn)
+
+    def find(self, classId):
+        """
+        Get every cached managed object of a class
+        :param classId: Class ID
+        :return: List of managed object elements
+        """
+        with self.lock:
+            return list(self.by_class.get(classId, {}).values())
+
+    def resync(self):
+        """
+        Replace the cache contents with a fresh configResolveClasses (one round trip for every cached class)
+        """
+        fresh = self.client.config_resolve_classes(sorted(self.class_ids))
+        with self.lock:
+            self.by_class = {class_id: {mo.attrib["dn"]: mo for mo in fresh.get(class_id, [])}
+                             for class_id in self.class_ids}
+            self.by_dn = {dn: mo for objects in self.by_class.values() for dn, mo in objects.items()}
+            self.synced_at = time.time()
+        self.resyncs += 1
+
+    def apply_event(self, mo):
+        """
+        Apply one changed managed object from a configMoChangeEvent
+        :param mo: Managed object element (status is "created", "modified" and/or "deleted")
+        """
+        if mo.tag not in self.class_ids or "dn" not in mo.attrib:
+            return
+
+        dn = mo.attrib["dn"]
+        status = mo.attrib.get("status", "")
+
+        # Modified events only carry the changed attributes, fetch the full object if it isn't cached yet
+        if "created" not in status and "deleted" not in status and self.get(dn) is None:
+            mo = self.client.config_resolve_dns([dn]).get(dn)
+            if mo is None:
+                return
+
+        with self.lock:
+            if "deleted" in status:
+                self.by_dn.pop(dn, None)
+                self.by_class[mo.tag].pop(dn, None)
+            else:
+                # Modified events only carry the changed attributes. Build a new element instead of updating the
+                # cached one, callers may still hold it
+                attrib = dict(self.by_dn[dn].attrib) if dn in self.by_dn else {}
+                attrib.update(mo.attrib)
+                attrib.pop("status", None)
+                merged = ET.Element(mo.tag, attrib)
+                self.by_dn[dn] = merged
+                self.by_class[mo.tag][dn] = merged
+            self.last_event_at = time.time()
+            self.events_applied += 1
+
+    def _subscribe(self):
+        """
+        Open the event stream, resync, then apply events until the stream ends or errors
+        """
+        response = self.client._post(f'<eventSubscribe cookie="{self.client.cookie}"/>', stream=True,
+                                     timeout=(10, EVENT_READ_TIMEOUT))
+        self._response = response
+        try:
+            # Subscribe first, then resync: changes made during the resync are queued on the stream, not lost
+            self.resync()
+            self.connected = True
+            self.disconnected_at = None
+
+            # The stream is a sequence of length-prefixed <methodVessel> documents, parse each one on its own
+            response.raw.decode_content = True
+            for document in iter_event_documents(response.raw):
+                if self._stop.is_set():
+                    return
+                try:
+                    vessel = ET.fromstring(document)
+                except ET.ParseError as e:
+                    raise Exception(f"Failed to parse event: {e}")
+                for change in vessel.iter("configMoChangeEvent"):
+                    in_config = change.find("inConfig")
+                    for mo in (in_config if in_config is not None else []):
+                        self.apply_event(mo)
+        finally:
+            self.connected = False
+            self.disconnected_at = self.disconnected_at or time.time()
+            response.close()
+
+    def _run(self):
+        """
+        Keep the event stream open, reconnecting (and logging in again if needed) with exponential backoff
+        """
+        backoff = RECONNECT_BACKOFF_MIN
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self._subscribe()
+                reason = "closed by UCS Manager"
+            except Exception as e:
+                reason = self.last_error = str(e)
+            if self._stop.is_set():
+                return
+
+            # Every reconnect resyncs, so back off even when the server closed the stream cleanly. Only a stream
+            # that stayed up for a while starts over at the minimum delay
+            if time.monotonic() - started >= RECONNECT_STABLE_AFTER:
+                backoff = RECONNECT_BACKOFF_MIN
+            console.print(f"[yellow]MO cache event stream lost ({reason}), reconnecting in {backoff}s...[/]")
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+
+            # The session cookie may have expired with the connection
+            if "UCSM Error" in reason:
+                try:
+                    self.client.login()
+                    self._logged_in = True
+                except Exception as login_error:
+                    self.last_error = str(login_error)
+
+    def start(self):
+        """
+        Seed the cache and start following the event stream in a background thread
+        """
+        self._thread = threading.Thread(target=self._run, name="ucs-mo-cache", daemon=True)
+        self._thread.start()
+
+        # Wait for the first resync so the cache is usable right away (reads fall back to the FI meanwhile)
+        deadline = time.monotonic() + 30
+        while self.synced_at is None and self._thread.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def stop(self):
+        """
+        Stop following the event stream
+        """
+        self._stop.set()
+
+        # Shut the socket down to unblock the listener's read (closing the response would wait for the reader)
+        connection = getattr(self._response.raw, "connection", None) if self._response is not None else None
+        if connection is not None and connection.sock is not None:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        if self._thread:
+            self._thread.join(timeout=5)
+
+        # Only log out sessions the cache opened itself, the original cookie belongs to the caller
+        if self._logged_in:
+            try:
+                self.client.logout()
+            except Exception as e:
+                console.print(f"[yellow]MO cache logout failed:[/] {e}")
+
+    def metrics(self):
+        """
+        Cache size and staleness
+        :return: Dict of metrics (ages in seconds, None if not applicable)
+        """
+        now = time.time()
+        with self.lock:
+            objects = len(self.by_dn)
+        return {
+            "connected": self.connected,
+            "objects": objects,
+            "events_applied": self.events_applied,
+            "resyncs": self.resyncs,
+            "seconds_since_resync": now - self.synced_at if self.synced_at else None,
+            "seconds_since_event": now - self.last_event_at if self.last_event_at else None,
+            # While disconnected, changes are missed until the next resync
+            "stale_for": now - self.disconnected_at if self.disconnected_at else 0.0,
+            "last_error": self.last_error,
+        }
+
+
+def load_batch(path):
+    """
+    Read a batch of Service Profiles to create
+    :param path: CSV file with "prefix" and "target_dn" columns
+    :return: List of (Service Profile name, target server DN)
+    """
+    with open(path, newline="") as f:
+        return [(row["prefix"].strip(), row["target_dn"].strip()) for row in csv.DictReader(f)]
+
+
+def duplicate_names(profiles):
+    """
+    Find Service Profile names that appear more than once in a batch
+    :param profiles: List of (Service Profile name, target server DN)
+    :return: Sorted list of duplicated names
+    """
+    seen = set()
+    return sorted({name for name, _ in profiles if name in seen or seen.add(name)})
+
+
+def print_association_report(profiles, states, org_dn="org-root"):
+    """
+    Print the association state of every Service Profile
+    :param profiles: List of (Service Profile name, target server DN)
+    :param states: Dict of DN -> (assocState, operState, configState) from wait_for_associations
+    :param org_dn: Organization of the Service Profiles
+    """
+    table = Table(title="Service Profile Associations")
+    table.add_column("Service Profile", style="cyan")
+    table.add_column("Target Server")
+    table.add_column("Assoc State", style="bold")
+    table.add_column("Oper State")
+    table.add_column("Config State")
+
+    for name, target_dn in profiles:
+        assoc, oper, config = states.get(f"{org_dn}/ls-{name}", ("unknown", None, None))
+        style = {"associated": "green", "failed": "red"}.get(assoc, "yellow")
+        table.add_row(name, target_dn, f"[{style}]{assoc}[/]", oper or "N/A", config or "N/A")
+    console.print(table)
+
+    associated = sum(1 for assoc, _, _ in states.values() if assoc == "associated")
+    console.print(f"[green]{associated} of {len(states)} Service Profiles associated[/]")
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Deploy UCS Service Profiles via Template")
     parser.add_argument('--template', required=True, help="Service Profile Template Name")
-    parser.add_argument('--prefix', required=True, help="Service Profile name prefix")
-    parser.add_argument('--target_dn', required=True, help="Server DN to associate with the Service Profile")
+    parser.add_argument('--prefix', nargs='+', default=[], help="Service Profile name prefix(es)")
+    parser.add_argument('--target_dn', nargs='+', default=[],
+                        help="Server DN(s) to associate with the Service Profile(s), one per prefix")
+    parser.add_argument('--batch', help="CSV file with prefix,target_dn columns (e.g., a whole rack)")
+    parser.add_argument('--wait', type=float, default=ASSOC_DEADLINE,
+                        help="Seconds to wait for associations to finish (0: don't wait)")
+    parser.add_argument('--cache', action='store_true',
+                        help="Follow lsServer changes through eventSubscribe instead of polling UCS Manager")
+    parser.add_argument('--debug', action='store_true', default=DEBUG_XML, help="Pretty-print XML responses")
     args = parser.parse_args()
 
-    ucs = UCS(UCS_HOST, UCS_USER, UCS_PASSWORD)
+    profiles = load_batch(args.batch) if args.batch else list(zip(args.prefix, args.target_dn))
+    if not profiles or (not args.batch and len(args.prefix) != len(args.target_dn)):
+        parser.error("give --batch, or the same number of --prefix and --target_dn values")
+    duplicates = duplicate_names(profiles)
+    if duplicates:
+        parser.error(f"duplicate Service Profile prefix(es): {', '.join(duplicates)}")
+
+    ucs = UCS(UCS_HOST, UCS_USER, UCS_PASSWORD, debug=args.debug)
 
     # Login to UCS Manager
     ucs.login()
+    if args.cache:
+        ucs.enable_cache(["lsServer"])
 
     # Resolve the class for Service Profiles, build a list of existing templates that are available for server
-    # provisioning
+    # provisioning. Only initial templates (not update templates), filtered by UCS Manager instead of the client
     classId = "lsServer"
-    root = ucs.config_resolve_class(classId)
-
-    out_configs = root.find("outConfigs")
-    templates = []
-    for ls_server in out_configs:
-        # Only include initial templates, not update templates
-        if ls_server.attrib.get("type") == "initial-template":
-            template_name = ls_server.attrib.get("name")
-            templates.append(template_name)
+    template_filter = property_filter("eq", classId, "type", "initial-template")
+    templates = [ls_server.attrib.get("name") for ls_server in ucs.iter_resolve_class(classId, template_filter)]
 
     console.print(f"[blue]Found {len(templates)} Service Profile Templates:[/]")
     for template in templates:
@@ -170,16 +917,16 @@ if __name__ == "__main__":
         ucs.logout()
         exit(1)
 
-    # Create Service Profile from Template
-    payload = f'<lsServer  dn="org-root/ls-{args.prefix}" name="{args.prefix}" srcTemplName="{args.template}"/>'
-    root = ucs.config_configure_object(payload)
+    # Create every Service Profile from the Template and associate it with its target server, one transaction
+    configured = ucs.instantiate_service_profiles(args.template, profiles)
+    console.print(f"[green]Created {len(configured)} Service Profiles from '{args.template}'[/]")
 
-    # Associate the Service Profile with the target server
-    payload = (
-        f'<lsBinding dn="org-root/ls-{args.prefix}" '
-        f'pnDn="{args.target_dn}" restrictMigration="no"/>'
-    )
-    root = ucs.config_configure_object(payload)
+    # Report the association state of every Service Profile
+    sp_dns = [f"org-root/ls-{name}" for name, _ in profiles]
+    states = ucs.wait_for_associations(sp_dns, deadline=args.wait)
+    print_association_report(profiles, states)
+    if ucs.cache:
+        console.print(f"MO cache: {ucs.cache.metrics()}")
 
     # Logout
     ucs.logout()